@@ -4,50 +4,57 @@ Article Generator for ML Website
 Generates SQL INSERT queries for articles by searching the internet and using AI to create content.
 """
 
+import argparse
+import asyncio
+import contextvars
+import functools
+import html
+import io
 import json
+import math
 import os
 import sys
 import re
-from typing import List, Dict, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterable, List, Dict, Optional, Sized
 from datetime import datetime
-import requests
-from call_llm import get_llm_output
+from db_loader import open_loader
+from instrumentation import RunInstrumentation, TopicTrace, add_stage, current_trace, record_llm_call, stage, tracing
+from json_repair import IncrementalJSONParser, parse_json_array, parse_json_object, strip_code_fences
+from llm_backends import CallLLMBackend, LLMBackend, StreamAbortedError
+from llm_cache import LLMCache
+from metrics import Counter, Gauge, GeneratorMetrics, MetricsHTTPServer, TextfileExporter
+from pipeline import Pipeline, Stage, batched
+from postprocess import PostProcessor
+from published_index import PublishedIndex, output_files
+from rate_limiter import AdaptiveRateLimiter, estimate_tokens
+from retry_policy import RetryPolicy
+from run_journal import RunJournal
+from sql_writer import (
+    OUTPUT_FORMATS,
+    SQL_HEADER,
+    RecordWriter,
+    SQLStreamWriter,
+    escape_sql_string,
+    format_values_row,
+    open_writer,
+)
+from topic_loader import TopicStream, expand_inputs, iter_topics
 
 
-class ArticleGenerator:
-    """Generate SQL INSERT queries for ML articles."""
-    
-    def __init__(self, model_name: str = "anthropic.claude-sonnet-4-20250514-v1-0"):
-        """
-        Initialize the article generator.
-        
-        Args:
-            model_name: LLM model name to use (default: Claude Sonnet 4)
-        """
-        self.model_name = model_name
-        
-    def generate_article_content(self, topic: str, tags: List[str]) -> Dict:
-        """
-        Generate article content using LLM based on topic.
-        
-        Args:
-            topic: Article topic
-            tags: List of tags
-            
-        Returns:
-            Dictionary with all article fields
-        """
-        # Generate the article using LLM
-        prompt = f"""You are an expert technical writer specializing in Machine Learning and AI.
-
-Generate a comprehensive article about: "{topic}"
+# Bump whenever the prompt template changes so cached responses are not reused
+PROMPT_TEMPLATE_VERSION = "4"
 
-Tags: {', '.join(tags)}
-
-Please provide a JSON response with the following fields:
+# reading_time is not asked for; it is computed from the content
+REQUIRED_FIELDS = ('title', 'content', 'excerpt', 'summary', 'summary_title')
 
-1. "title": An engaging, SEO-friendly title (50-60 characters)
-2. "content": Comprehensive article which will describe the concept in very easy language along with mathematical equations to explain everything. 
+# Instructions for each field of the full article prompt
+ARTICLE_FIELD_PROMPTS = {
+    'title': 'An engaging, SEO-friendly title (50-60 characters)',
+    'content': """Comprehensive article which will describe the concept in very easy language along with mathematical equations to explain everything. 
     This should be a technical document.
     The document structure should be as follows (Give a proper heading to each section, but use the following sections for your understanding):
     - Introduction
@@ -68,55 +75,1208 @@ The content should be formatted in HTML with:
    - Lists using <ul>/<ol> and <li> tags
    - Strong emphasis with <strong> tags for key concepts
    - Make it technical but accessible
-   - Write mathematical equations properly which can be rendered properly in the article.
-   
-3. "excerpt": A compelling 100-150 character preview that makes readers want to click
-
-4. "summary": Exactly ~100 words explaining the core concept. Should be:
+   - Write mathematical equations properly which can be rendered properly in the article.""",
+    'excerpt': 'A compelling 100-150 character preview that makes readers want to click',
+    'summary': """Exactly ~100 words explaining the core concept. Should be:
    - Self-contained and comprehensive
    - Not too technical but should be able to explain the concept in a way that is easy to understand using one practical life example.
    - Cover key points and applications
    - Standalone explanation that doesn't require reading the full article
-   - The intent of this summary is to make user understand the concept in a very short and concise way and very quickly.
+   - The intent of this summary is to make user understand the concept in a very short and concise way and very quickly.""",
+    'summary_title': 'A short 2-5 word title for the concept (different from main title)',
+}
+
+# Short instructions used when re-asking for fields missing from a response
+FIELD_INSTRUCTIONS = {
+    'title': 'An engaging, SEO-friendly title (50-60 characters)',
+    'excerpt': 'A compelling 100-150 character preview that makes readers want to click',
+    'summary': 'Exactly ~100 words explaining the core concept with one practical life example, '
+               'self-contained and easy to understand',
+    'summary_title': 'A short 2-5 word title for the concept (different from main title)',
+}
+
+# Sections of an article, used by the 'sections' generation strategy
+ARTICLE_SECTIONS = (
+    ('Introduction', 'Introduce the concept and why it matters'),
+    ('Learning outcomes', 'What the reader will be able to do after this chapter. Keep this very short'),
+    ('Problem framing', 'The problem this method addresses and how it is framed'),
+    ('Intuition', 'The intuition behind the method, in very easy language'),
+    ('Assumptions', 'Assumptions of this method (if any)'),
+    ('Mathematical equations', 'The mathematics, with equations written so they render properly'),
+    ('Code implementation', 'A small code implementation in <pre><code> blocks'),
+    ('Evaluation', 'How to evaluate the method and its results'),
+    ('Pitfalls and best practices', 'Common pitfalls and best practices'),
+    ('Conclusion', 'Wrap up the key takeaways'),
+)
+
+# 'single' asks for the whole article in one response; 'sections' generates the
+# content sections concurrently and derives the short fields from the result
+GENERATION_STRATEGIES = ('single', 'sections')
 
-5. "summary_title": A short 2-5 word title for the concept (different from main title)
+METADATA_FIELDS = ('title', 'excerpt', 'summary', 'summary_title')
 
-6. "reading_time": Estimated reading time in minutes (based on content length)
+# Characters of the article content included when re-asking for missing fields
+REASK_CONTENT_CHARS = 6000
+
+# Characters of tag-stripped article text included when deriving the short
+# fields from finished content: the whole of a 2500-word article with room to
+# spare, well within any model's context
+DERIVE_CONTENT_CHARS = 60000
+
+# Roles an LLM call can play; model_routing maps each role to a model.
+# 'content' writes the article body, 'metadata' writes the short fields
+# (title, excerpt, summary, summary_title) from finished content.
+MODEL_ROLES = ('content', 'metadata')
+
+# Reading speeds used to compute reading_time
+WORDS_PER_MINUTE = 200
+CODE_WORDS_PER_MINUTE = 100
+
+CODE_BLOCK_PATTERN = re.compile(r'<pre\b[^>]*>.*?</pre>|<code\b[^>]*>.*?</code>', re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# What to do with a topic whose generation failed after all retries:
+# insert placeholder content, or leave it out of the output and report it
+FAILURE_MODES = ('placeholder', 'skip')
+
+# Tokens reserved against the rate limiter's budget for one article response,
+# one section of a sectioned article, and the short fields re-asked or derived
+# from finished content; the reservation is corrected to the actual usage
+# once the response is in
+EXPECTED_RESPONSE_TOKENS = 4000
+SECTION_RESPONSE_TOKENS = 500
+METADATA_RESPONSE_TOKENS = 400
+
+# Instruction for the field identifying each article of a multi-topic response
+TOPIC_FIELD_PROMPT = 'The topic this article is about, exactly as listed'
+
+# Opening line of every prompt
+WRITER_ROLE = "You are an expert technical writer specializing in Machine Learning and AI."
+
+# A streamed response is abandoned if no JSON object starts within this many characters
+STREAM_PREAMBLE_CHARS = 2000
+
+# Characters of streamed content checked for the topic before the rest is awaited
+RELEVANCE_CHECK_CHARS = 1500
+
+# Topic words too common to show that an article is about its topic
+GENERIC_TOPIC_WORDS = {
+    'and', 'the', 'for', 'with', 'from', 'into', 'vs', 'versus', 'what', 'how',
+    'introduction', 'understanding', 'learning', 'machine', 'model', 'models', 'data', 'using'
+}
+
+
+def topic_keywords(topic: str) -> List[str]:
+    """
+    Distinctive words of a topic, used to check that an article is about it.
+    
+    Args:
+        topic: Article topic
+        
+    Returns:
+        Lowercase words, empty if the topic has no distinctive words
+    """
+    words = re.findall(r'[a-z0-9]+', topic.lower())
+    return [word for word in words if len(word) >= 3 and word not in GENERIC_TOPIC_WORDS]
+
+
+def estimate_reading_time(
+    content: str,
+    words_per_minute: int = WORDS_PER_MINUTE,
+    code_words_per_minute: int = CODE_WORDS_PER_MINUTE
+) -> int:
+    """
+    Compute the reading time of an HTML article.
+    
+    Code blocks are counted separately at the (slower) code reading rate;
+    tags are stripped and entities decoded before counting words.
+    
+    Args:
+        content: Article HTML
+        words_per_minute: Reading speed for prose
+        code_words_per_minute: Reading speed for code
+        
+    Returns:
+        Reading time in whole minutes (at least 1)
+    """
+    code_words = 0
+    for block in CODE_BLOCK_PATTERN.findall(content):
+        code_words += len(html.unescape(TAG_PATTERN.sub(' ', block)).split())
+    
+    prose = TAG_PATTERN.sub(' ', CODE_BLOCK_PATTERN.sub(' ', content))
+    prose_words = len(html.unescape(prose).split())
+    
+    minutes = prose_words / words_per_minute + code_words / code_words_per_minute
+    return max(1, math.ceil(minutes))
+
+
+def article_text(content: str) -> str:
+    """
+    Plain text of an HTML article, with tags stripped and entities decoded.
+    
+    Args:
+        content: Article HTML
+        
+    Returns:
+        The article's words separated by single spaces
+    """
+    return ' '.join(html.unescape(TAG_PATTERN.sub(' ', content)).split())
+
+
+class MissingFieldsError(ValueError):
+    """Raised when a parsed article response lacks required fields."""
+    
+    def __init__(self, missing: List[str], article_data: Dict):
+        super().__init__(f"Missing required field{'s' if len(missing) != 1 else ''}: {', '.join(missing)}")
+        self.missing = missing
+        self.article_data = article_data
+
+
+class ArticleGenerator:
+    """Generate SQL INSERT queries for ML articles."""
+    
+    def __init__(
+        self,
+        model_name: str = "anthropic.claude-sonnet-4-20250514-v1-0",
+        cache: Optional[LLMCache] = None,
+        refresh_cache: bool = False,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        on_failure: str = 'placeholder',
+        generation_strategy: str = 'single',
+        model_routing: Optional[Dict[str, str]] = None,
+        words_per_minute: int = WORDS_PER_MINUTE,
+        code_words_per_minute: int = CODE_WORDS_PER_MINUTE,
+        backend: Optional[LLMBackend] = None,
+        metrics: Optional[GeneratorMetrics] = None,
+        stream: bool = False,
+        topics_per_request: int = 1,
+        postprocess_workers: int = 0
+    ):
+        """
+        Initialize the article generator.
+        
+        Args:
+            model_name: LLM model name to use (default: Claude Sonnet 4)
+            cache: Optional on-disk cache of LLM responses
+            refresh_cache: Ignore cached responses but still store new ones
+            rate_limiter: Optional limiter shared by all LLM calls
+            retry_policy: Retries of failed LLM calls and unparseable
+                responses (default: RetryPolicy())
+            on_failure: 'placeholder' to insert placeholder content for topics
+                that still fail after retries, 'skip' to leave them out
+            generation_strategy: 'single' for one LLM call per article,
+                'sections' for concurrent per-section calls
+            model_routing: Model per role in MODEL_ROLES, e.g.
+                {'metadata': 'fast-model'}; roles not listed use model_name.
+                Routing 'metadata' to another model makes the content model
+                write only the article body.
+            words_per_minute: Prose reading speed used for reading_time
+            code_words_per_minute: Code reading speed used for reading_time
+            backend: LLM backend answering the prompts (default:
+                CallLLMBackend, i.e. call_llm.get_llm_output)
+            metrics: Optional Prometheus metrics updated as the batch runs
+            stream: Stream article responses, parsing fields as they arrive
+                and abandoning malformed or off-topic output early (single
+                strategy only)
+            topics_per_request: Topics whose articles are requested together
+                in one LLM call by write_batch_sql (single strategy only)
+            postprocess_workers: Worker processes that count words for
+                reading_time and escape and format the rows of a batch, off
+                the threads or event loop waiting on the LLM (0: do it inline)
+        """
+        if on_failure not in FAILURE_MODES:
+            raise ValueError(f"on_failure must be one of {FAILURE_MODES}, got '{on_failure}'")
+        if generation_strategy not in GENERATION_STRATEGIES:
+            raise ValueError(
+                f"generation_strategy must be one of {GENERATION_STRATEGIES}, got '{generation_strategy}'"
+            )
+        if topics_per_request > 1 and generation_strategy != 'single':
+            raise ValueError("topics_per_request > 1 requires the 'single' generation strategy")
+        if stream and generation_strategy != 'single':
+            raise ValueError("stream requires the 'single' generation strategy")
+        
+        self.model_name = model_name
+        self.backend = backend if backend is not None else CallLLMBackend()
+        self.stream = stream
+        self.topics_per_request = max(1, topics_per_request)
+        self.postprocess_workers = postprocess_workers
+        # Worker processes of the batch being generated, if any
+        self.postprocessor: Optional[PostProcessor] = None
+        self.cache = cache
+        self.refresh_cache = refresh_cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.on_failure = on_failure
+        self.generation_strategy = generation_strategy
+        self.words_per_minute = words_per_minute
+        self.code_words_per_minute = code_words_per_minute
+        self.model_routing = dict(model_routing or {})
+        unknown_roles = set(self.model_routing) - set(MODEL_ROLES)
+        if unknown_roles:
+            raise ValueError(f"Unknown model roles: {', '.join(sorted(unknown_roles))}")
+        self.failed_topics: List[Dict] = []
+        self._failed_lock = threading.Lock()
+        self.instrumentation = RunInstrumentation()
+        self.metrics = metrics
+        if metrics is not None:
+            self.instrumentation.listeners.append(metrics.observe_topic)
+        
+    def build_article_prompt(
+        self,
+        topic: str,
+        tags: List[str],
+        fields: Optional[List[str]] = None
+    ) -> str:
+        """
+        Build the LLM prompt for an article: the static instructions,
+        then the topic and its tags.
+        
+        Args:
+            topic: Article topic
+            tags: List of tags
+            fields: Fields to ask for (default: all of REQUIRED_FIELDS)
+            
+        Returns:
+            Prompt text
+        """
+        return self.article_instructions(fields) + f"""Generate a comprehensive article about: "{topic}"
+
+Tags: {', '.join(tags)}"""
+    
+    def article_instructions(self, fields: Optional[List[str]] = None) -> str:
+        """
+        Static instructions that start every article prompt.
+        
+        They are byte-identical for every topic, so providers that cache
+        prompt prefixes only process them once per batch.
+        
+        Args:
+            fields: Fields to ask for (default: all of REQUIRED_FIELDS)
+            
+        Returns:
+            Prompt prefix, followed by the topic in the full prompt
+        """
+        fields = fields or REQUIRED_FIELDS
+        field_prompts = "\n\n".join(
+            f'{i}. "{field}": {ARTICLE_FIELD_PROMPTS[field]}'
+            for i, field in enumerate(fields, 1)
+        )
+        return f"""{WRITER_ROLE}
+
+Write a comprehensive article about the topic given at the end of this prompt.
+
+Please provide a JSON response with the following fields:
+
+{field_prompts}
 
 Make the content authoritative, well-researched, and valuable for ML practitioners.
 
-Return ONLY valid JSON, no other text."""
+Return ONLY valid JSON, no other text.
 
+"""
+    
+    def model_for(self, role: str) -> str:
+        """
+        Model that handles LLM calls of a role.
+        
+        Args:
+            role: One of MODEL_ROLES
+            
+        Returns:
+            LLM model name
+        """
+        return self.model_routing.get(role, self.model_name)
+    
+    def routes_metadata_separately(self) -> bool:
+        """Whether the short fields come from a different model than the content."""
+        return self.model_for('metadata') != self.model_for('content')
+    
+    def build_generation_prompt(self, topic: str, tags: List[str]) -> str:
+        """
+        Build the prompt sent to the content model for an article.
+        
+        Asks for the content only when the short fields are routed to a
+        separate model, and for the whole article otherwise.
+        
+        Args:
+            topic: Article topic
+            tags: List of tags
+            
+        Returns:
+            Prompt text
+        """
+        return self.build_article_prompt(topic, tags, fields=self.generation_fields())
+    
+    def generation_fields(self) -> List[str]:
+        """
+        Fields asked of the content model.
+        
+        Returns:
+            Just the content when the short fields are routed to a separate
+            model, and all of REQUIRED_FIELDS otherwise
+        """
+        return ['content'] if self.routes_metadata_separately() else list(REQUIRED_FIELDS)
+    
+    def build_multi_article_prompt(self, topics: List[Dict]) -> str:
+        """
+        Build one LLM prompt asking for the articles of several topics.
+        
+        The instructions are the same as for a single article and are sent
+        once; the response is a JSON array with one article per topic.
+        
+        Args:
+            topics: Topic dictionaries with 'name' and 'tags'
+            
+        Returns:
+            Prompt text
+        """
+        topic_lines = "\n".join(
+            f'{i}. "{topic_data["name"]}" (Tags: {", ".join(topic_data.get("tags", []))})'
+            for i, topic_data in enumerate(topics, 1)
+        )
+        return self.multi_article_instructions() + f"Topics:\n\n{topic_lines}"
+    
+    def multi_article_instructions(self) -> str:
+        """
+        Static instructions that start every multi-topic prompt.
+        
+        Returns:
+            Prompt prefix, followed by the list of topics in the full prompt
+        """
+        prompts = dict(ARTICLE_FIELD_PROMPTS, topic=TOPIC_FIELD_PROMPT)
+        field_prompts = "\n\n".join(
+            f'{i}. "{field}": {prompts[field]}'
+            for i, field in enumerate(['topic'] + self.generation_fields(), 1)
+        )
+        return f"""{WRITER_ROLE}
+
+Write one comprehensive article for each of the topics listed at the end of this prompt.
+
+Please provide a JSON array with one object per topic, in the order listed. Each object must have the following fields:
+
+{field_prompts}
+
+Make the content authoritative, well-researched, and valuable for ML practitioners.
+
+Return ONLY a valid JSON array, no other text.
+
+"""
+    
+    def instruction_prefixes(self) -> List[str]:
+        """Static instruction prefixes of the prompts this generator sends."""
+        return [
+            self.article_instructions(self.generation_fields()),
+            self.multi_article_instructions(),
+            self.section_instructions(),
+        ]
+    
+    def prompt_prefix_length(self, prompt: str) -> int:
+        """
+        Length of the static instructions a prompt starts with.
+        
+        Backends pass it on to providers that can cache prompt prefixes.
+        
+        Args:
+            prompt: Prompt text
+            
+        Returns:
+            Characters of the prompt's instruction prefix, 0 if it has none
+        """
+        return max(
+            (len(prefix) for prefix in self.instruction_prefixes() if prompt.startswith(prefix)),
+            default=0
+        )
+    
+    def call_llm(
+        self,
+        prompt: str,
+        role: str = 'content',
+        response_tokens: int = EXPECTED_RESPONSE_TOKENS
+    ) -> str:
+        """
+        Call the LLM, respecting the rate limiter if one is configured.
+        
+        Args:
+            prompt: Prompt text
+            role: Role of the call, selecting the model from model_routing
+            response_tokens: Tokens expected in the response
+            
+        Returns:
+            Raw LLM response text
+        """
+        model_name = self.model_for(role)
+        prefix_length = self.prompt_prefix_length(prompt)
+        with self.llm_slot(prompt, response_tokens) as usage, self.track_llm_call(prompt, role, prefix_length) as call:
+            call['response'] = self.backend.generate(prompt, model_name, cacheable_prefix=prefix_length)
+            usage['tokens_used'] = estimate_tokens(prompt) + estimate_tokens(call['response'])
+        return call['response']
+    
+    @contextmanager
+    def llm_slot(self, prompt: str, response_tokens: int = EXPECTED_RESPONSE_TOKENS):
+        """
+        Hold a rate limiter slot for one LLM call, if a limiter is configured.
+        
+        The block may store the tokens the call actually consumed in the
+        yielded dictionary's 'tokens_used' entry, returning the rest of the
+        reservation to the limiter's budget.
+        
+        Args:
+            prompt: Prompt text, used to estimate the call's tokens
+            response_tokens: Tokens expected in the response
+        """
+        if self.rate_limiter is None:
+            yield {'tokens_used': None}
+            return
+        
+        waiting = time.perf_counter()
+        with self.rate_limiter.limit(estimate_tokens(prompt) + response_tokens) as usage:
+            add_stage('wait', time.perf_counter() - waiting)
+            yield usage
+    
+    def stream_article_response(self, prompt: str, topic: str):
+        """
+        Stream an article response, parsing its fields as they arrive.
+        
+        The stream is abandoned as soon as it is clearly unusable: no JSON
+        object within STREAM_PREAMBLE_CHARS characters, or a title and first
+        RELEVANCE_CHECK_CHARS characters of content that never mention the
+        topic.
+        
+        Args:
+            prompt: Rendered prompt text
+            topic: Article topic
+            
+        Returns:
+            Tuple of the raw response text and the parser holding the fields
+            
+        Raises:
+            StreamAbortedError: If the stream was abandoned
+        """
+        parser = IncrementalJSONParser()
+        keywords = topic_keywords(topic)
+        relevance_checked = not keywords
+        chunks = []
+        
+        prefix_length = self.prompt_prefix_length(prompt)
+        with self.llm_slot(prompt) as usage, self.track_llm_call(prompt, 'content', prefix_length) as call:
+            stream = self.backend.stream(prompt, self.model_for('content'), cacheable_prefix=prefix_length)
+            try:
+                for chunk in stream:
+                    chunks.append(chunk)
+                    with stage('parse'):
+                        parser.feed(chunk)
+                    
+                    if not parser.started and parser.chars_seen > STREAM_PREAMBLE_CHARS:
+                        call['response'] = ''.join(chunks)
+                        raise StreamAbortedError(f"No JSON object in the first {STREAM_PREAMBLE_CHARS} characters")
+                    
+                    content = parser.partial('content')
+                    if not relevance_checked and (len(content) >= RELEVANCE_CHECK_CHARS or 'content' in parser.fields):
+                        relevance_checked = True
+                        text = f"{parser.partial('title')} {content[:RELEVANCE_CHECK_CHARS]}".lower()
+                        if not any(keyword in text for keyword in keywords):
+                            call['response'] = ''.join(chunks)
+                            raise StreamAbortedError(f"Response does not appear to be about '{topic}'")
+            finally:
+                # Stop receiving an abandoned stream
+                close = getattr(stream, 'close', None)
+                if close is not None:
+                    close()
+                usage['tokens_used'] = estimate_tokens(prompt) + estimate_tokens(''.join(chunks))
+            call['response'] = ''.join(chunks)
+        
+        return call['response'], parser
+    
+    @contextmanager
+    def track_llm_call(self, prompt: str, role: str, prefix_length: int = 0):
+        """
+        Time one LLM call for the run report and the metrics.
+        
+        The block stores the response text in the yielded dictionary's
+        'response' entry. Failed calls are counted too, with an empty response.
+        
+        Args:
+            prompt: Prompt text
+            role: Role of the call
+            prefix_length: Characters of the prompt's cacheable instruction prefix
+        """
+        call = {'response': ''}
+        if self.metrics is not None:
+            self.metrics.llm_call_started()
+        start = time.perf_counter()
+        error = None
         try:
-            # Call the custom LLM function
-            response_content = get_llm_output(prompt, model_name=self.model_name)
+            with stage('llm'):
+                yield call
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            record_llm_call(prompt, call['response'], prefix_length)
+            if self.metrics is not None:
+                self.metrics.llm_call_finished(role, time.perf_counter() - start, prompt, call['response'], error)
+    
+    def parse_article_response(self, response_content: str, streamed: Optional[IncrementalJSONParser] = None) -> Dict:
+        """
+        Parse and validate the raw LLM response for an article.
+        
+        Malformed JSON (fences, trailing prose, unescaped quotes or newlines
+        in the HTML content, truncation) is repaired where possible.
+        
+        Args:
+            response_content: Raw LLM response text
+            streamed: Parser that consumed the streamed response; its fields
+                are used if it parsed the whole object
             
-            # Try to extract JSON if wrapped in markdown code blocks
-            if response_content.startswith("```"):
-                response_content = re.sub(r'^```json?\s*\n?', '', response_content)
-                response_content = re.sub(r'\n?```\s*$', '', response_content)
+        Returns:
+            Dictionary with all article fields
             
-            article_data = json.loads(response_content)
+        Raises:
+            ValueError: If no JSON object can be recovered from the response
+            MissingFieldsError: If the response misses required fields
+        """
+        if streamed is not None and streamed.done:
+            article_data = dict(streamed.fields)
+        else:
+            with stage('parse'):
+                article_data = parse_json_object(response_content)
+        self.validate_article(article_data)
+        return article_data
+    
+    def validate_article(self, article_data: Dict) -> None:
+        """
+        Check that an article has every required field.
+        
+        Content cut off mid-document (not ending in a closing HTML tag) counts
+        as missing, since a truncated response cannot be completed cheaply.
+        
+        Args:
+            article_data: Parsed article dictionary
             
-            # Validate required fields
-            required_fields = ['title', 'content', 'excerpt', 'summary', 'summary_title', 'reading_time']
-            for field in required_fields:
-                if field not in article_data:
-                    raise ValueError(f"Missing required field: {field}")
+        Raises:
+            MissingFieldsError: If required fields are missing or empty
+        """
+        with stage('validate'):
+            missing = [
+                field for field in REQUIRED_FIELDS
+                if article_data.get(field) in (None, '')
+            ]
+            content = article_data.get('content')
+            if 'content' not in missing and not str(content).rstrip().endswith('>'):
+                missing.insert(0, 'content')
+        
+        if missing:
+            raise MissingFieldsError(missing, article_data)
+    
+    def build_missing_fields_prompt(self, topic: str, article_data: Dict, missing: List[str]) -> str:
+        """
+        Build a short prompt asking only for fields missing from an article.
+        
+        Args:
+            topic: Article topic
+            article_data: Partially generated article, including its content
+            missing: Names of the missing fields
             
-            return article_data
+        Returns:
+            Prompt text
+        """
+        fields = "\n".join(
+            f'{i}. "{field}": {FIELD_INSTRUCTIONS[field]}'
+            for i, field in enumerate(missing, 1)
+        )
+        return f"""{WRITER_ROLE}
+
+Below is an article about: "{topic}"
+
+{article_data['content'][:REASK_CONTENT_CHARS]}
+
+Based on this article, provide a JSON response with only the following fields:
+
+{fields}
+
+Return ONLY valid JSON, no other text."""
+    
+    def build_metadata_prompt(self, topic: str, content: str, fields: List[str]) -> str:
+        """
+        Build a prompt deriving short fields from a whole finished article.
+        
+        Unlike build_missing_fields_prompt, the article is not cut short: its
+        tag-stripped text is sent, up to DERIVE_CONTENT_CHARS characters, so
+        the fields can summarize every section.
+        
+        Args:
+            topic: Article topic
+            content: Article HTML
+            fields: Names of the fields to derive
+            
+        Returns:
+            Prompt text
+        """
+        fields_list = "\n".join(
+            f'{i}. "{field}": {FIELD_INSTRUCTIONS[field]}'
+            for i, field in enumerate(fields, 1)
+        )
+        return f"""{WRITER_ROLE}
+
+Below is the full text of an article about: "{topic}"
+
+{article_text(content)[:DERIVE_CONTENT_CHARS]}
+
+Based on the whole article, provide a JSON response with only the following fields:
+
+{fields_list}
+
+Return ONLY valid JSON, no other text."""
+    
+    def build_followup_prompt(self, topic: str, error: MissingFieldsError) -> str:
+        """
+        Build the follow-up prompt for the fields missing from a response.
+        
+        When the short fields are routed to their own model, they are all
+        derived there from the whole finished content; otherwise a partial
+        response is completed from the start of its content.
+        
+        Args:
+            topic: Article topic
+            error: Validation error carrying the partial article
+            
+        Returns:
+            Prompt text
+        """
+        if self.routes_metadata_separately():
+            return self.build_metadata_prompt(topic, error.article_data['content'], error.missing)
+        return self.build_missing_fields_prompt(topic, error.article_data, error.missing)
+    
+    def complete_missing_fields(self, topic: str, error: MissingFieldsError) -> Dict:
+        """
+        Ask the LLM for just the fields missing from a partial response.
+        
+        The follow-up call is retried on its own, so its failures never
+        cost another request for the content.
+        
+        Args:
+            topic: Article topic
+            error: Validation error carrying the partial article
+            
+        Returns:
+            Dictionary with all article fields
+            
+        Raises:
+            MissingFieldsError: If the content itself is missing, or fields
+                are still missing after the follow-up request
+        """
+        if 'content' in error.missing:
+            raise error
+        
+        print(f"   🩹 Requesting {', '.join(error.missing)} for '{topic}' from {self.model_for('metadata')}")
+        with stage('prompt'):
+            prompt = self.build_followup_prompt(topic, error)
+        return self.retry_policy.call(
+            lambda: self.merge_missing_fields(
+                error, self.call_llm(prompt, role='metadata', response_tokens=METADATA_RESPONSE_TOKENS)
+            ),
+            on_retry=functools.partial(self.report_retry, topic)
+        )
+    
+    def merge_missing_fields(self, error: MissingFieldsError, response_content: str) -> Dict:
+        """
+        Merge a follow-up response into a partial article.
+        
+        Args:
+            error: Validation error carrying the partial article
+            response_content: Raw response to the missing fields prompt
+            
+        Returns:
+            Dictionary with all article fields
+        """
+        article_data = dict(error.article_data)
+        with stage('parse'):
+            extra = parse_json_object(response_content)
+        for field in error.missing:
+            if extra.get(field) not in (None, ''):
+                article_data[field] = extra[field]
+        
+        self.validate_article(article_data)
+        return article_data
+    
+    def cache_version(self) -> str:
+        """
+        Version string of the prompts behind a cached article.
+        
+        Returns:
+            Prompt template version, qualified by the generation strategy
+            and the metadata model
+        """
+        version = PROMPT_TEMPLATE_VERSION
+        if self.generation_strategy != 'single':
+            version += f"/{self.generation_strategy}"
+        if self.routes_metadata_separately():
+            version += f"+{self.model_for('metadata')}"
+        return version
+    
+    def get_cached_article(self, prompt: str) -> Optional[Dict]:
+        """
+        Look up a previously generated article for a prompt.
+        
+        Args:
+            prompt: Rendered prompt text
+            
+        Returns:
+            Cached article dictionary, or None on a miss
+        """
+        if self.cache is None or self.refresh_cache:
+            return None
+        
+        with stage('cache'):
+            key = self.cache.make_key(self.model_for('content'), prompt, self.cache_version())
+            entry = self.cache.get(key)
+        
+        trace = current_trace()
+        if entry and trace is not None:
+            trace.cached = True
+        return entry['article'] if entry else None
+    
+    def store_cached_article(self, prompt: str, response_content: str, article_data: Dict) -> None:
+        """
+        Store a successfully parsed LLM response in the cache.
+        
+        Args:
+            prompt: Rendered prompt text
+            response_content: Raw LLM response text
+            article_data: Article parsed from the response
+        """
+        if self.cache is None:
+            return
+        
+        with stage('cache'):
+            key = self.cache.make_key(self.model_for('content'), prompt, self.cache_version())
+            self.cache.put(
+                key,
+                response_content,
+                article_data,
+                model_name=self.model_for('content'),
+                prompt_version=self.cache_version()
+            )
+    
+    def fallback_article(self, topic: str) -> Dict:
+        """
+        Build placeholder content used when generation fails.
+        
+        Args:
+            topic: Article topic
+            
+        Returns:
+            Dictionary with all article fields
+        """
+        return {
+            'title': f"Understanding {topic}: A Comprehensive Guide",
+            'content': f"<p>This is a comprehensive guide about {topic}.</p>",
+            'excerpt': f"Learn about {topic} in machine learning.",
+            'summary': f"{topic} is an important concept in machine learning. " * 10,
+            'summary_title': topic[:30]
+        }
+    
+    def request_article(self, prompt: str, topic: str) -> Dict:
+        """
+        Request an article from the LLM and parse the response, retrying failures.
+        
+        If the response only lacks some short fields (always the case when
+        they are routed to a separate model), they are requested in a small
+        follow-up call instead of regenerating the whole article. The
+        follow-up is retried separately, keeping the parsed content.
+        
+        Args:
+            prompt: Rendered prompt text
+            topic: Article topic
+            
+        Returns:
+            Dictionary with all article fields
+        """
+        def attempt():
+            streamed = None
+            if self.stream:
+                response_content, streamed = self.stream_article_response(prompt, topic)
+            else:
+                response_content = self.call_llm(prompt)
+            try:
+                return response_content, self.parse_article_response(response_content, streamed)
+            except MissingFieldsError as e:
+                if 'content' in e.missing:
+                    raise
+                return response_content, e
+        
+        response_content, article_data = self.retry_policy.call(
+            attempt, on_retry=functools.partial(self.report_retry, topic)
+        )
+        if isinstance(article_data, MissingFieldsError):
+            article_data = self.complete_missing_fields(topic, article_data)
+        self.store_cached_article(prompt, response_content, article_data)
+        return article_data
+    
+    def report_retry(self, topic: str, attempt: int, error: BaseException, delay: float) -> None:
+        """
+        Print a notice before a failed attempt is retried.
+        
+        Args:
+            topic: Article topic
+            attempt: Number of the attempt that failed
+            error: Error of the failed attempt
+            delay: Seconds until the next attempt
+        """
+        print(f"   🔁 Attempt {attempt} for '{topic}' failed ({error}), retrying in {delay:.1f}s")
+        if self.metrics is not None:
+            self.metrics.retry(error)
+    
+    def build_section_prompt(self, topic: str, tags: List[str], index: int) -> str:
+        """
+        Build the LLM prompt for one section of an article.
+        
+        Args:
+            topic: Article topic
+            tags: List of tags
+            index: Position of the section in ARTICLE_SECTIONS
+            
+        Returns:
+            Prompt text
+        """
+        name, guidance = ARTICLE_SECTIONS[index]
+        return self.section_instructions() + f"""You are writing a technical article about: "{topic}"
+
+Tags: {', '.join(tags)}
+
+Write ONLY section {index + 1}, "{name}": {guidance}."""
+    
+    def section_instructions(self) -> str:
+        """
+        Static instructions that start every section prompt.
+        
+        Returns:
+            Prompt prefix, followed by the topic and the section to write in
+            the full prompt
+        """
+        outline = "\n".join(
+            f"    {i}. {section}" for i, (section, _) in enumerate(ARTICLE_SECTIONS, 1)
+        )
+        return f"""{WRITER_ROLE}
+
+You will write one section of a technical article; the topic and the section are given at the end of this prompt.
+
+The article has the following sections, each written separately:
+{outline}
+
+Describe the concept in very easy language, using mathematical equations where they help.
+Do not repeat material that belongs to the other sections.
+*Unless asked to keep it very short, the section should be around 150-250 words*
+Format the section in HTML with:
+   - One <h2> heading for the section (give it a proper title), <h3> subheadings if needed
+   - Paragraphs in <p> tags
+   - Code examples in <pre><code> blocks if relevant
+   - Lists using <ul>/<ol> and <li> tags
+   - Strong emphasis with <strong> tags for key concepts
+   - Mathematical equations written so they can be rendered properly in the article
+
+Return ONLY the HTML of the requested section, no other text.
+
+"""
+    
+    def parse_section_response(self, response_content: str) -> str:
+        """
+        Clean up the HTML returned for one section.
+        
+        Args:
+            response_content: Raw LLM response text
+            
+        Returns:
+            Section HTML
+            
+        Raises:
+            ValueError: If the response contains no HTML
+        """
+        with stage('parse'):
+            html = strip_code_fences(response_content)
+            start = html.find('<')
+            end = html.rfind('>')
+        if start == -1 or end < start:
+            raise ValueError("Section response contains no HTML")
+        return html[start:end + 1]
+    
+    def request_section(self, topic: str, tags: List[str], index: int) -> str:
+        """
+        Generate one section of an article, retrying failures.
+        
+        Args:
+            topic: Article topic
+            tags: List of tags
+            index: Position of the section in ARTICLE_SECTIONS
+            
+        Returns:
+            Section HTML
+        """
+        with stage('prompt'):
+            prompt = self.build_section_prompt(topic, tags, index)
+        return self.retry_policy.call(
+            lambda: self.parse_section_response(self.call_llm(prompt, response_tokens=SECTION_RESPONSE_TOKENS)),
+            on_retry=functools.partial(self.report_retry, f"{topic} / {ARTICLE_SECTIONS[index][0]}")
+        )
+    
+    def request_metadata(self, topic: str, content: str) -> Dict:
+        """
+        Derive the short article fields from finished content, retrying failures.
+        
+        Args:
+            topic: Article topic
+            content: Article HTML
+            
+        Returns:
+            Dictionary with all article fields
+        """
+        partial = MissingFieldsError(list(METADATA_FIELDS), {'content': content})
+        with stage('prompt'):
+            prompt = self.build_metadata_prompt(topic, content, partial.missing)
+        return self.retry_policy.call(
+            lambda: self.merge_missing_fields(
+                partial, self.call_llm(prompt, role='metadata', response_tokens=METADATA_RESPONSE_TOKENS)
+            ),
+            on_retry=functools.partial(self.report_retry, topic)
+        )
+    
+    def request_sectioned_article(self, prompt: str, topic: str, tags: List[str]) -> Dict:
+        """
+        Generate an article section by section.
+        
+        The sections are generated by concurrent LLM calls and stitched in
+        order; title, excerpt and summary are then derived from the stitched
+        content in one short call.
+        
+        Args:
+            prompt: Single-call prompt of the article, used as the cache key
+            topic: Article topic
+            tags: List of tags
+            
+        Returns:
+            Dictionary with all article fields
+        """
+        print(f"   🧩 Generating {len(ARTICLE_SECTIONS)} sections concurrently for: {topic}")
+        with ThreadPoolExecutor(max_workers=len(ARTICLE_SECTIONS)) as executor:
+            # Each section runs in a copy of this context so its stages count
+            # towards the topic's trace
+            futures = [
+                executor.submit(contextvars.copy_context().run, self.request_section, topic, tags, index)
+                for index in range(len(ARTICLE_SECTIONS))
+            ]
+            sections = [future.result() for future in futures]
+        
+        content = "\n\n".join(sections)
+        article_data = self.request_metadata(topic, content)
+        self.store_cached_article(prompt, content, article_data)
+        return article_data
+    
+    def match_group_items(self, topics: List[Dict], items: List) -> Dict[str, Dict]:
+        """
+        Assign the items of a multi-topic response to their topics.
+        
+        Items are matched by their 'topic' field, falling back to their
+        position when the topic was not echoed back.
+        
+        Args:
+            topics: Requested topic dictionaries
+            items: Parsed response items
+            
+        Returns:
+            Response item per topic name, for the topics that got one
+        """
+        names = {topic_data['name'].strip().casefold(): topic_data['name'] for topic_data in topics}
+        matched = {}
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            name = names.get(str(item.get('topic', '')).strip().casefold())
+            if name is None and position < len(topics):
+                name = topics[position]['name']
+            if name is not None and name not in matched:
+                matched[name] = item
+        return matched
+    
+    def request_article_group(self, topics: List[Dict]) -> Dict[str, Dict]:
+        """
+        Make one LLM request for the articles of several topics.
+        
+        Args:
+            topics: Topic dictionaries with 'name' and 'tags'
             
+        Returns:
+            Unvalidated response item per topic name
+            
+        Raises:
+            ValueError: If no JSON array can be recovered from the response
+        """
+        with stage('prompt'):
+            prompt = self.build_multi_article_prompt(topics)
+        response_content = self.call_llm(prompt, response_tokens=EXPECTED_RESPONSE_TOKENS * len(topics))
+        with stage('parse'):
+            items = parse_json_array(response_content)
+        return self.match_group_items(topics, items)
+    
+    def generate_article_group(self, topics: List[Dict]):
+        """
+        Generate the articles of several topics with one LLM request.
+        
+        Every article is validated on its own. Topics whose article is
+        missing or invalid are left out of the result so the caller can
+        re-queue them for a regular single-topic request; if the request
+        itself fails after retries, all of them are.
+        
+        Args:
+            topics: Topic dictionaries with 'name' and 'tags'
+            
+        Returns:
+            Tuple of the valid articles by topic name and the trace of the
+            shared request
+        """
+        shared = TopicTrace(f"{len(topics)} topics")
+        articles = {}
+        with tracing(shared):
+            print(f"   📦 Requesting {len(topics)} articles in one call: {', '.join(t['name'] for t in topics)}")
+            try:
+                items = self.retry_policy.call(
+                    functools.partial(self.request_article_group, topics),
+                    on_retry=functools.partial(self.report_retry, f"{len(topics)} topics")
+                )
+            except Exception as e:
+                print(f"   ↩️  Multi-topic request failed ({e}), generating its topics one by one")
+                return articles, shared
+            
+            for topic_data in topics:
+                name = topic_data['name']
+                item = {field: value for field, value in items.get(name, {}).items() if field != 'topic'}
+                try:
+                    try:
+                        self.validate_article(item)
+                        article_data = item
+                    except MissingFieldsError as e:
+                        article_data = self.complete_missing_fields(name, e)
+                except Exception as e:
+                    print(f"   ↩️  Re-queueing '{name}': {e}")
+                    continue
+                
+                articles[name] = article_data
+                self.store_cached_article(
+                    self.build_generation_prompt(name, topic_data.get('tags', [])),
+                    json.dumps(item, ensure_ascii=False),
+                    article_data
+                )
+        
+        return articles, shared
+    
+    def generate_article_content(self, topic: str, tags: List[str], fallback: bool = True) -> Dict:
+        """
+        Generate article content using LLM based on topic.
+        
+        Failed LLM calls and unparseable responses are retried according to
+        the retry policy.
+        
+        Args:
+            topic: Article topic
+            tags: List of tags
+            fallback: Return placeholder content instead of raising once
+                retries are exhausted
+            
+        Returns:
+            Dictionary with all article fields
+        """
+        with stage('prompt'):
+            prompt = self.build_generation_prompt(topic, tags)
+        
+        cached = self.get_cached_article(prompt)
+        if cached is not None:
+            print(f"   💾 Using cached content for: {topic}")
+            return cached
+        
+        try:
+            if self.generation_strategy == 'sections':
+                # Every section call is retried on its own
+                return self.request_sectioned_article(prompt, topic, tags)
+            
+            # Call the custom LLM function
+            return self.request_article(prompt, topic)
+            
+        except Exception as e:
+            if not fallback:
+                raise
+            print(f"❌ Error generating content for '{topic}': {str(e)}")
+            # Return fallback content
+            return self.fallback_article(topic)
+    
+    def handle_generation_failure(self, topic: str, error: BaseException) -> Optional[Dict]:
+        """
+        Record a topic whose generation failed and decide what replaces it.
+        
+        Args:
+            topic: Article topic
+            error: Error of the last attempt
+            
+        Returns:
+            Placeholder content, or None if failed topics are skipped
+        """
+        print(f"❌ Error generating content for '{topic}': {str(error)}")
+        with self._failed_lock:
+            self.failed_topics.append({'topic': topic, 'error': str(error)})
+        
+        trace = current_trace()
+        if trace is not None:
+            trace.status = 'skipped' if self.on_failure == 'skip' else 'failed'
+        
+        if self.on_failure == 'skip':
+            print(f"   ⏭️  Excluding '{topic}' from the output")
+            return None
+        return self.fallback_article(topic)
+    
+    def generate_journaled_article(
+        self,
+        topic: str,
+        tags: List[str],
+        journal: Optional[RunJournal] = None,
+        article_data: Optional[Dict] = None
+    ) -> Optional[Dict]:
+        """
+        Generate article content and record the outcome in a run journal.
+        
+        Failed topics get placeholder content or are skipped, depending on
+        on_failure, and are journaled as 'failed' so a resumed run generates
+        them again.
+        
+        Args:
+            topic: Article topic
+            tags: List of tags
+            journal: Run journal to record the outcome in
+            article_data: Article already generated, e.g. by a multi-topic
+                request, to journal instead of generating one
+            
+        Returns:
+            Dictionary with all article fields, or None for a skipped topic
+        """
+        start = time.time()
+        error = None
+        try:
+            if article_data is None:
+                article_data = self.generate_article_content(topic, tags, fallback=False)
+            status = 'completed'
         except Exception as e:
-            print(f"❌ Error generating content for '{topic}': {str(e)}")
-            # Return fallback content
-            return {
-                'title': f"Understanding {topic}: A Comprehensive Guide",
-                'content': f"<p>This is a comprehensive guide about {topic}.</p>",
-                'excerpt': f"Learn about {topic} in machine learning.",
-                'summary': f"{topic} is an important concept in machine learning. " * 10,
-                'summary_title': topic[:30],
-                'reading_time': 10
-            }
+            article_data = self.handle_generation_failure(topic, e)
+            status = 'failed'
+            error = str(e)
+        
+        if journal is not None:
+            journal.record_topic(
+                topic,
+                status,
+                article=article_data,
+                elapsed=time.time() - start,
+                error=error
+            )
+        
+        return article_data
     
     def get_featured_image(self, topic: str) -> str:
         """
@@ -151,16 +1311,162 @@ Return ONLY valid JSON, no other text."""
         Returns:
             Escaped text
         """
-        return text.replace("'", "''")
+        return escape_sql_string(text)
     
-    def generate_sql_insert(
+    def build_article_record(
+        self,
+        article_data: Dict,
+        topic: str,
+        tags: List[str],
+        is_premium: bool = False,
+        views: int = 0,
+        created_by: str = 'c41b5bc1-d819-4b8a-ab04-cf1ae4692304',
+        compute_reading_time: bool = True
+    ) -> Dict:
+        """
+        Combine generated article data with topic settings into a table row.
+        
+        Args:
+            article_data: Dictionary with all article fields
+            topic: Article topic
+            tags: List of tags
+            is_premium: Whether article is premium
+            views: Initial view count
+            created_by: UUID of the creator
+            compute_reading_time: Count the words of the content for
+                reading_time; if False, reading_time is left None for a
+                PostProcessor to fill in
+            
+        Returns:
+            Column values of the articles table, unescaped
+        """
+        return {
+            'title': article_data['title'],
+            'content': article_data['content'],
+            'excerpt': article_data.get('excerpt', ''),
+            'summary': article_data.get('summary', ''),
+            'summary_title': article_data.get('summary_title', ''),
+            'featured_image': self.get_featured_image(topic),
+            'reading_time': self.reading_time_function()(article_data['content']) if compute_reading_time else None,
+            'tags': list(tags),
+            'is_premium': bool(is_premium),
+            'views': views,
+            'created_by': created_by,
+        }
+    
+    def reading_time_function(self):
+        """
+        Reading time calculation with the generator's reading speeds.
+        
+        Returns:
+            Picklable function of the article HTML returning minutes
+        """
+        return functools.partial(
+            estimate_reading_time,
+            words_per_minute=self.words_per_minute,
+            code_words_per_minute=self.code_words_per_minute
+        )
+    
+    def open_postprocessor(self, formatter) -> Optional[PostProcessor]:
+        """
+        Start the worker processes finishing the rows of a batch.
+        
+        Args:
+            formatter: Row formatter of the batch's output, or None
+            
+        Returns:
+            Post-processor, or None if postprocess_workers is 0
+        """
+        if self.postprocess_workers <= 0:
+            return None
+        return PostProcessor(self.postprocess_workers, formatter, self.reading_time_function())
+    
+    def format_sql_row(
         self,
+        article_data: Dict,
         topic: str,
         tags: List[str],
         is_premium: bool = False,
         views: int = 0,
         created_by: str = 'c41b5bc1-d819-4b8a-ab04-cf1ae4692304'
     ) -> str:
+        """
+        Format generated article data as one row of the VALUES list.
+        
+        Args:
+            article_data: Dictionary with all article fields
+            topic: Article topic
+            tags: List of tags
+            is_premium: Whether article is premium
+            views: Initial view count
+            created_by: UUID of the creator
+            
+        Returns:
+            SQL VALUES row
+        """
+        record = self.build_article_record(
+            article_data,
+            topic=topic,
+            tags=tags,
+            is_premium=is_premium,
+            views=views,
+            created_by=created_by
+        )
+        with stage('escape'):
+            return format_values_row(record)
+    
+    def generate_article_record(
+        self,
+        topic: str,
+        tags: List[str],
+        is_premium: bool = False,
+        views: int = 0,
+        created_by: str = 'c41b5bc1-d819-4b8a-ab04-cf1ae4692304',
+        journal: Optional[RunJournal] = None,
+        article_data: Optional[Dict] = None,
+        compute_reading_time: bool = True
+    ) -> Optional[Dict]:
+        """
+        Generate an article and return it as a row of the articles table.
+        
+        Args:
+            topic: Article topic
+            tags: List of tags
+            is_premium: Whether article is premium
+            views: Initial view count
+            created_by: UUID of the creator
+            journal: Optional run journal to record the outcome in
+            article_data: Article already generated, e.g. by a multi-topic
+                request
+            compute_reading_time: See build_article_record
+            
+        Returns:
+            Column values of the articles table, unescaped, or None if the
+            topic failed and on_failure is 'skip'
+        """
+        article_data = self.generate_journaled_article(topic, tags, journal=journal, article_data=article_data)
+        if article_data is None:
+            return None
+        
+        return self.build_article_record(
+            article_data,
+            topic=topic,
+            tags=tags,
+            is_premium=is_premium,
+            views=views,
+            created_by=created_by,
+            compute_reading_time=compute_reading_time
+        )
+    
+    def generate_sql_insert(
+        self,
+        topic: str,
+        tags: List[str],
+        is_premium: bool = False,
+        views: int = 0,
+        created_by: str = 'c41b5bc1-d819-4b8a-ab04-cf1ae4692304',
+        journal: Optional[RunJournal] = None
+    ) -> Optional[str]:
         """
         Generate a SQL INSERT statement for an article.
         
@@ -170,90 +1476,580 @@ Return ONLY valid JSON, no other text."""
             is_premium: Whether article is premium
             views: Initial view count
             created_by: UUID of the creator
+            journal: Optional run journal to record the outcome in
+            
+        Returns:
+            SQL INSERT statement, or None if the topic failed and on_failure
+            is 'skip'
+        """
+        record = self.generate_article_record(
+            topic=topic,
+            tags=tags,
+            is_premium=is_premium,
+            views=views,
+            created_by=created_by,
+            journal=journal
+        )
+        if record is None:
+            return None
+        with stage('escape'):
+            return format_values_row(record)
+    
+    def assemble_batch_sql(self, inserts: List[str]) -> str:
+        """
+        Join VALUES rows into one complete INSERT statement.
+        
+        Args:
+            inserts: SQL VALUES rows
+            
+        Returns:
+            Complete SQL INSERT statement, or '' without rows (an INSERT
+            with an empty VALUES list is invalid SQL)
+        """
+        if not inserts:
+            return ''
+        
+        # Join all inserts with commas
+        sql_values = ",\n".join(inserts)
+        
+        # Complete SQL statement
+        return SQL_HEADER + sql_values + ";"
+    
+    def write_batch_sql(
+        self,
+        topics: Iterable[Dict],
+        writer: RecordWriter,
+        created_by: str = 'c41b5bc1-d819-4b8a-ab04-cf1ae4692304',
+        max_workers: int = 1,
+        journal: Optional[RunJournal] = None
+    ) -> int:
+        """
+        Generate articles and stream their rows to a writer.
+        
+        Topics flow through a pipeline of bounded stages: generation on
+        max_workers threads, then optional post-processing in worker
+        processes. Each row is handed to the writer as soon as it and every
+        row before it are ready, so only a small window of articles is held
+        in memory and completed rows survive a crash later in the batch.
+        Topics are read from the iterable only as fast as they are
+        generated, so it can be a lazy stream of unknown length.
+        
+        With a journal, every topic's outcome is recorded, and topics the
+        journal already lists as completed are written from the journaled
+        article instead of being generated again. For writers that keep the
+        rows of earlier runs (database loaders), committed rows are recorded
+        too, and topics whose rows were already committed are skipped.
+        
+        Args:
+            topics: Topic dictionaries with 'name', 'tags', 'is_premium', 'views',
+                e.g. a list or a TopicStream
+            writer: Destination of the generated rows, e.g. SQLStreamWriter
+            created_by: UUID of the creator
+            max_workers: Number of topics to generate at the same time
+            journal: Optional run journal to record and resume from
             
         Returns:
-            SQL INSERT statement
+            Number of rows written
         """
-        print(f"\n📝 Generating article for: {topic}")
-        print(f"   Tags: {', '.join(tags)}")
+        max_workers = max(1, max_workers)
+        completed = journal.completed_articles() if journal is not None else {}
+        loaded = journal.loaded_topics() if journal is not None and writer.keeps_rows else set()
+        self.failed_topics = []
+        self.instrumentation.reset()
+        
+        # Streamed topics are counted as they are read
+        total = len(topics) if isinstance(topics, Sized) else 0
+        count = f"{total} articles" if isinstance(topics, Sized) else "streamed topics"
+        print(f"\n🚀 Starting batch generation for {count} "
+              f"({max_workers} worker{'s' if max_workers != 1 else ''})...\n")
+        if loaded:
+            print(f"   ⏭️  Skipping {len(loaded)} articles already loaded into the database")
+        if completed.keys() - loaded:
+            print(f"   ⏭️  Reusing {len(completed.keys() - loaded)} completed articles from the journal\n")
         
-        # Generate content
-        print("   🤖 Generating content with AI...")
-        article_data = self.generate_article_content(topic, tags)
+        def process(
+            i: int,
+            topic_data: Dict,
+            article_data: Optional[Dict] = None,
+            shared: Optional[TopicTrace] = None,
+            share: float = 0.0,
+            started: Optional[float] = None
+        ):
+            with self.instrumentation.trace_topic(
+                topic_data['name'], index=i, total=total, start=started
+            ) as trace:
+                if shared is not None:
+                    trace.add_share(shared, share)
+                if topic_data['name'] in loaded:
+                    trace.status = 'loaded'
+                    return trace, None, None
+                if topic_data['name'] in completed:
+                    trace.status = 'journaled'
+                    record = self.build_article_record(
+                        completed[topic_data['name']],
+                        topic=topic_data['name'],
+                        tags=topic_data.get('tags', []),
+                        is_premium=topic_data.get('is_premium', False),
+                        views=topic_data.get('views', 0),
+                        created_by=created_by,
+                        compute_reading_time=self.postprocessor is None
+                    )
+                else:
+                    record = self.generate_article_record(
+                        topic=topic_data['name'],
+                        tags=topic_data.get('tags', []),
+                        is_premium=topic_data.get('is_premium', False),
+                        views=topic_data.get('views', 0),
+                        created_by=created_by,
+                        journal=journal,
+                        article_data=article_data,
+                        compute_reading_time=self.postprocessor is None
+                    )
+                
+                return trace, record, None
         
-        # Get featured image
-        featured_image = self.get_featured_image(topic)
+        def process_group(start: int, group: List[Dict]) -> List:
+            if len(group) == 1:
+                return [process(start, group[0])]
+            
+            # Journaled and cached topics don't need the LLM
+            started = time.perf_counter()
+            requested = [
+                topic_data for topic_data in group
+                if topic_data['name'] not in completed
+                and self.get_cached_article(
+                    self.build_generation_prompt(topic_data['name'], topic_data.get('tags', []))
+                ) is None
+            ]
+            articles, shared = {}, None
+            if len(requested) > 1:
+                articles, shared = self.generate_article_group(requested)
+            
+            # Topics missing from the response are generated one by one
+            return [
+                process(
+                    start + offset,
+                    topic_data,
+                    article_data=articles.get(topic_data['name']),
+                    shared=shared if topic_data in requested else None,
+                    share=1.0 / len(requested) if requested else 0.0,
+                    started=started
+                )
+                for offset, topic_data in enumerate(group)
+            ]
+        
+        def finish(results: List) -> List:
+            # Count words, escape and format in a worker process, leaving the
+            # generation threads free for the next LLM calls
+            finished = []
+            for trace, record, row in results:
+                if record is not None:
+                    record, row, seconds = self.postprocessor.submit(record).result()
+                    trace.add_stage('escape', seconds)
+                finished.append((trace, record, row))
+            return finished
+        
+        # Journal the topics of each batch a database loader commits, so a
+        # resumed run does not insert them again
+        committing: Dict[int, str] = {}
+        committing_lock = threading.Lock()
         
-        # Escape all text fields
-        title = self.escape_sql_string(article_data['title'])
-        content = self.escape_sql_string(article_data['content'])
-        excerpt = self.escape_sql_string(article_data.get('excerpt', ''))
-        summary = self.escape_sql_string(article_data.get('summary', ''))
-        summary_title = self.escape_sql_string(article_data.get('summary_title', ''))
+        def record_loaded(records: List[Dict]) -> None:
+            with committing_lock:
+                topics = [committing.pop(id(record)) for record in records if id(record) in committing]
+            if topics:
+                journal.record_loaded(topics)
         
-        # Format tags as PostgreSQL array
-        tags_str = ", ".join([f"'{tag}'" for tag in tags])
+        track_commits = journal is not None and writer.keeps_rows
+        if track_commits:
+            writer.on_commit = record_loaded
+        
+        group_size = self.topics_per_request
+        self.postprocessor = self.open_postprocessor(writer.formatter)
+        stages = [
+            Stage('generate', lambda job: process_group(job[0] * group_size + 1, job[1]), workers=max_workers)
+        ]
+        if self.postprocessor is not None:
+            stages.append(Stage('postprocess', finish, workers=self.postprocess_workers))
+        # Rows are written strictly in topic order by this thread; the cap on
+        # topic groups in flight keeps memory flat when the writer falls behind
+        pipeline = Pipeline(stages, max_in_flight=max_workers * 2 + self.postprocess_workers)
+        
+        written = 0
+        try:
+            for results in pipeline.run(enumerate(batched(topics, group_size))):
+                for trace, record, row in results:
+                    # Skipped topics (on_failure='skip') produce no row
+                    if record is None:
+                        continue
+                    if track_commits:
+                        with committing_lock:
+                            committing[id(record)] = trace.topic
+                    with tracing(trace):
+                        if self.postprocessor is None:
+                            writer.write_record(record)
+                        else:
+                            writer.write_formatted(record, row)
+                    written += 1
+        finally:
+            if self.postprocessor is not None:
+                self.postprocessor.close()
+                self.postprocessor = None
+            self.instrumentation.pipeline = pipeline.stats()
         
-        # Build SQL INSERT statement
-        sql = f"""  (
-    '{title}',
-    '{content}',
-    '{excerpt}',
-    '{summary}',
-    '{summary_title}',
-    '{featured_image}',
-    {article_data.get('reading_time', 10)},
-    ARRAY[{tags_str}],
-    {str(is_premium).lower()},
-    {views},
-    '{created_by}'
-  )"""
+        self.instrumentation.finish()
+        print(f"\n\n✨ Successfully generated SQL for {written} articles!\n")
+        self.print_failure_report()
         
-        print(f"   ✅ Generated: {article_data['title']}")
+        return written
+    
+    def print_failure_report(self) -> None:
+        """Print the topics that failed in the last batch."""
+        if not self.failed_topics:
+            return
         
-        return sql
+        action = "excluded from the output" if self.on_failure == 'skip' else "inserted with placeholder content"
+        print(f"⚠️  {len(self.failed_topics)} topics failed after retries and were {action}:")
+        for failure in self.failed_topics:
+            print(f"   - {failure['topic']}: {failure['error']}")
     
     def generate_batch_sql(
         self,
         topics: List[Dict],
-        created_by: str = 'c41b5bc1-d819-4b8a-ab04-cf1ae4692304'
+        created_by: str = 'c41b5bc1-d819-4b8a-ab04-cf1ae4692304',
+        max_workers: int = 1
     ) -> str:
         """
         Generate SQL INSERT statements for multiple articles.
         
+        Topics are generated concurrently on a bounded thread pool when
+        max_workers > 1. The VALUES rows are always emitted in the original
+        topic order.
+        
         Args:
             topics: List of topic dictionaries with 'name', 'tags', 'is_premium', 'views'
             created_by: UUID of the creator
+            max_workers: Number of topics to generate at the same time
             
         Returns:
             Complete SQL INSERT statement
         """
-        print(f"\n🚀 Starting batch generation for {len(topics)} articles...\n")
+        buffer = io.StringIO()
+        with SQLStreamWriter(buffer) as writer:
+            self.write_batch_sql(topics, writer, created_by=created_by, max_workers=max_workers)
         
-        sql_header = """INSERT INTO articles (title, content, excerpt, summary, summary_title, featured_image, reading_time, tags, is_premium, views, created_by)
-VALUES
-"""
+        return buffer.getvalue()
+
+
+class AsyncArticleGenerator(ArticleGenerator):
+    """Generate SQL INSERT queries for ML articles from asyncio code."""
+    
+    def __init__(
+        self,
+        model_name: str = "anthropic.claude-sonnet-4-20250514-v1-0",
+        llm_client: Optional[Callable[..., Awaitable[str]]] = None,
+        **kwargs
+    ):
+        """
+        Initialize the async article generator.
+        
+        Args:
+            model_name: LLM model name to use (default: Claude Sonnet 4)
+            llm_client: Async callable taking (prompt, model_name=...) and
+                returning the response text. Defaults to the backend's
+                generate_async.
+            **kwargs: Options of ArticleGenerator (cache, rate_limiter, backend, ...);
+                stream and topics_per_request are not supported
+            
+        Raises:
+            ValueError: If streaming or multi-topic requests are asked for
+        """
+        if kwargs.get('stream'):
+            raise ValueError("AsyncArticleGenerator does not support stream=True")
+        if kwargs.get('topics_per_request', 1) > 1:
+            raise ValueError("AsyncArticleGenerator does not support topics_per_request > 1")
+        super().__init__(model_name=model_name, **kwargs)
+        self.llm_client = llm_client
+    
+    async def call_llm_async(
+        self,
+        prompt: str,
+        role: str = 'content',
+        response_tokens: int = EXPECTED_RESPONSE_TOKENS
+    ) -> str:
+        """
+        Call the LLM without blocking the event loop, respecting the rate
+        limiter if one is configured.
+        
+        Args:
+            prompt: Prompt text
+            role: Role of the call, selecting the model from model_routing
+            response_tokens: Tokens expected in the response
+            
+        Returns:
+            Raw LLM response text
+        """
+        model_name = self.model_for(role)
+        prefix_length = self.prompt_prefix_length(prompt)
+        if self.rate_limiter is None:
+            with self.track_llm_call(prompt, role, prefix_length) as call:
+                call['response'] = await self._call_llm_client(prompt, model_name, prefix_length)
+            return call['response']
+        
+        waiting = time.perf_counter()
+        async with self.rate_limiter.limit_async(estimate_tokens(prompt) + response_tokens) as usage:
+            add_stage('wait', time.perf_counter() - waiting)
+            with self.track_llm_call(prompt, role, prefix_length) as call:
+                call['response'] = await self._call_llm_client(prompt, model_name, prefix_length)
+            usage['tokens_used'] = estimate_tokens(prompt) + estimate_tokens(call['response'])
+        return call['response']
+    
+    async def _call_llm_client(self, prompt: str, model_name: str, prefix_length: int = 0) -> str:
+        if self.llm_client is not None:
+            return await self.llm_client(prompt, model_name=model_name)
+        return await self.backend.generate_async(prompt, model_name, cacheable_prefix=prefix_length)
+    
+    async def request_article_async(self, prompt: str, topic: str) -> Dict:
+        """
+        Request an article from the LLM and parse the response, retrying failures.
+        
+        If the response only lacks some short fields (always the case when
+        they are routed to a separate model), they are requested in a small
+        follow-up call instead of regenerating the whole article. The
+        follow-up is retried separately, keeping the parsed content.
+        
+        Args:
+            prompt: Rendered prompt text
+            topic: Article topic
+            
+        Returns:
+            Dictionary with all article fields
+        """
+        async def attempt():
+            response_content = await self.call_llm_async(prompt)
+            try:
+                return response_content, self.parse_article_response(response_content)
+            except MissingFieldsError as e:
+                if 'content' in e.missing:
+                    raise
+                return response_content, e
+        
+        response_content, article_data = await self.retry_policy.call_async(
+            attempt, on_retry=functools.partial(self.report_retry, topic)
+        )
+        if isinstance(article_data, MissingFieldsError):
+            partial = article_data
+            print(f"   🩹 Requesting {', '.join(partial.missing)} for '{topic}' from {self.model_for('metadata')}")
+            with stage('prompt'):
+                followup_prompt = self.build_followup_prompt(topic, partial)
+            
+            async def followup_attempt() -> Dict:
+                followup_response = await self.call_llm_async(
+                    followup_prompt, role='metadata', response_tokens=METADATA_RESPONSE_TOKENS
+                )
+                return self.merge_missing_fields(partial, followup_response)
+            
+            article_data = await self.retry_policy.call_async(
+                followup_attempt,
+                on_retry=functools.partial(self.report_retry, topic)
+            )
+        self.store_cached_article(prompt, response_content, article_data)
+        return article_data
+    
+    async def request_sectioned_article_async(self, prompt: str, topic: str, tags: List[str]) -> Dict:
+        """
+        Generate an article section by section from asyncio code.
+        
+        Args:
+            prompt: Single-call prompt of the article, used as the cache key
+            topic: Article topic
+            tags: List of tags
+            
+        Returns:
+            Dictionary with all article fields
+        """
+        print(f"   🧩 Generating {len(ARTICLE_SECTIONS)} sections concurrently for: {topic}")
+        
+        async def section(index: int) -> str:
+            with stage('prompt'):
+                section_prompt = self.build_section_prompt(topic, tags, index)
+            
+            async def attempt() -> str:
+                return self.parse_section_response(
+                    await self.call_llm_async(section_prompt, response_tokens=SECTION_RESPONSE_TOKENS)
+                )
+            
+            return await self.retry_policy.call_async(
+                attempt,
+                on_retry=functools.partial(self.report_retry, f"{topic} / {ARTICLE_SECTIONS[index][0]}")
+            )
+        
+        sections = await asyncio.gather(*(section(i) for i in range(len(ARTICLE_SECTIONS))))
+        content = "\n\n".join(sections)
+        
+        partial = MissingFieldsError(list(METADATA_FIELDS), {'content': content})
+        with stage('prompt'):
+            metadata_prompt = self.build_metadata_prompt(topic, content, partial.missing)
+        
+        async def metadata_attempt() -> Dict:
+            metadata_response = await self.call_llm_async(
+                metadata_prompt, role='metadata', response_tokens=METADATA_RESPONSE_TOKENS
+            )
+            return self.merge_missing_fields(partial, metadata_response)
+        
+        article_data = await self.retry_policy.call_async(
+            metadata_attempt,
+            on_retry=functools.partial(self.report_retry, topic)
+        )
+        self.store_cached_article(prompt, content, article_data)
+        return article_data
+    
+    async def generate_article_content_async(
+        self,
+        topic: str,
+        tags: List[str],
+        fallback: bool = True
+    ) -> Dict:
+        """
+        Generate article content using LLM based on topic.
+        
+        Args:
+            topic: Article topic
+            tags: List of tags
+            fallback: Return placeholder content instead of raising once
+                retries are exhausted
+            
+        Returns:
+            Dictionary with all article fields
+        """
+        with stage('prompt'):
+            prompt = self.build_generation_prompt(topic, tags)
+        
+        cached = self.get_cached_article(prompt)
+        if cached is not None:
+            print(f"   💾 Using cached content for: {topic}")
+            return cached
+        
+        try:
+            if self.generation_strategy == 'sections':
+                return await self.request_sectioned_article_async(prompt, topic, tags)
+            
+            return await self.request_article_async(prompt, topic)
+            
+        except Exception as e:
+            if not fallback:
+                raise
+            print(f"❌ Error generating content for '{topic}': {str(e)}")
+            # Return fallback content
+            return self.fallback_article(topic)
+    
+    async def generate_sql_insert_async(
+        self,
+        topic: str,
+        tags: List[str],
+        is_premium: bool = False,
+        views: int = 0,
+        created_by: str = 'c41b5bc1-d819-4b8a-ab04-cf1ae4692304'
+    ) -> Optional[str]:
+        """
+        Generate a SQL INSERT statement for an article.
         
-        inserts = []
-        for i, topic_data in enumerate(topics, 1):
-            print(f"\n[{i}/{len(topics)}] Processing: {topic_data['name']}")
+        Args:
+            topic: Article topic
+            tags: List of tags
+            is_premium: Whether article is premium
+            views: Initial view count
+            created_by: UUID of the creator
             
-            insert = self.generate_sql_insert(
-                topic=topic_data['name'],
-                tags=topic_data.get('tags', []),
-                is_premium=topic_data.get('is_premium', False),
-                views=topic_data.get('views', 0),
+        Returns:
+            SQL INSERT statement, or None if the topic failed and on_failure
+            is 'skip'
+        """
+        try:
+            article_data = await self.generate_article_content_async(topic, tags, fallback=False)
+        except Exception as e:
+            article_data = self.handle_generation_failure(topic, e)
+            if article_data is None:
+                return None
+        
+        if self.postprocessor is None:
+            return self.format_sql_row(
+                article_data,
+                topic=topic,
+                tags=tags,
+                is_premium=is_premium,
+                views=views,
                 created_by=created_by
             )
-            inserts.append(insert)
         
-        # Join all inserts with commas
-        sql_values = ",\n".join(inserts)
+        # Keep word counting and escaping off the event loop
+        record = self.build_article_record(
+            article_data,
+            topic=topic,
+            tags=tags,
+            is_premium=is_premium,
+            views=views,
+            created_by=created_by,
+            compute_reading_time=False
+        )
+        record, row, seconds = await self.postprocessor.finish_async(record)
+        add_stage('escape', seconds)
+        return row
+    
+    async def generate_batch_sql_async(
+        self,
+        topics: List[Dict],
+        created_by: str = 'c41b5bc1-d819-4b8a-ab04-cf1ae4692304',
+        max_concurrency: int = 100
+    ) -> str:
+        """
+        Generate SQL INSERT statements for multiple articles concurrently.
         
-        # Complete SQL statement
-        complete_sql = sql_header + sql_values + ";"
+        At most max_concurrency generations are in flight at once. The
+        VALUES rows are emitted in the original topic order.
+        
+        Args:
+            topics: List of topic dictionaries with 'name', 'tags', 'is_premium', 'views'
+            created_by: UUID of the creator
+            max_concurrency: Maximum number of in-flight generations
+            
+        Returns:
+            Complete SQL INSERT statement
+        """
+        print(f"\n🚀 Starting async batch generation for {len(topics)} articles "
+              f"(up to {max_concurrency} in flight)...\n")
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.failed_topics = []
+        self.instrumentation.reset()
+        
+        async def process(i: int, topic_data: Dict) -> Optional[str]:
+            async with semaphore:
+                with self.instrumentation.trace_topic(topic_data['name'], index=i, total=len(topics)):
+                    return await self.generate_sql_insert_async(
+                        topic=topic_data['name'],
+                        tags=topic_data.get('tags', []),
+                        is_premium=topic_data.get('is_premium', False),
+                        views=topic_data.get('views', 0),
+                        created_by=created_by
+                    )
+        
+        # gather returns results in argument order, keeping the topic order;
+        # each task runs in its own context, so the traces do not mix
+        self.postprocessor = self.open_postprocessor(format_values_row)
+        try:
+            inserts = await asyncio.gather(*(process(i, topic_data) for i, topic_data in enumerate(topics, 1)))
+        finally:
+            if self.postprocessor is not None:
+                self.postprocessor.close()
+                self.postprocessor = None
+        inserts = [insert for insert in inserts if insert is not None]
+        self.instrumentation.finish()
         
-        print(f"\n\n✨ Successfully generated SQL for {len(topics)} articles!\n")
+        complete_sql = self.assemble_batch_sql(inserts)
+        
+        print(f"\n\n✨ Successfully generated SQL for {len(inserts)} articles!\n")
+        self.print_failure_report()
         
         return complete_sql
 
@@ -262,20 +2058,252 @@ def load_topics_from_file(filepath: str) -> List[Dict]:
     """
     Load topics from a JSON file.
     
+    Use TopicStream to process a large file without loading it at once.
+    
     Args:
-        filepath: Path to JSON file
+        filepath: Path to a {"topics": [...]} JSON file or a newline-delimited
+            JSON file with one topic per line
         
     Returns:
         List of topic dictionaries
     """
-    with open(filepath, 'r') as f:
-        data = json.load(f)
+    return list(iter_topics(filepath))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
     
-    return data.get('topics', [])
+    Args:
+        argv: Argument list (default: sys.argv[1:])
+        
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate SQL INSERT queries for ML articles."
+    )
+    parser.add_argument(
+        'input_files',
+        nargs='*',
+        metavar='input_file',
+        help="Topics files or directories of them, merged into one batch with "
+             "repeated topic names skipped (default: topics.json, or the resumed "
+             "run's files)"
+    )
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=int(os.getenv('ARTICLE_WORKERS', '1')),
+        help="Number of topics to generate concurrently "
+             "(default: $ARTICLE_WORKERS or 1)"
+    )
+    parser.add_argument(
+        '--fast-model',
+        default=os.getenv('LLM_FAST_MODEL_NAME'),
+        help="Cheaper/faster model for the title, excerpt, summary and summary "
+             "title, written from the finished content "
+             "(default: $LLM_FAST_MODEL_NAME, or the main model)"
+    )
+    parser.add_argument(
+        '--strategy',
+        choices=GENERATION_STRATEGIES,
+        default=os.getenv('ARTICLE_STRATEGY', 'single'),
+        help="'single' generates each article in one LLM call; 'sections' "
+             "generates its sections concurrently and stitches them "
+             "(default: $ARTICLE_STRATEGY or single)"
+    )
+    parser.add_argument(
+        '--wpm',
+        type=int,
+        default=int(os.getenv('ARTICLE_WPM', str(WORDS_PER_MINUTE))),
+        help=f"Reading speed used to compute reading_time "
+             f"(default: $ARTICLE_WPM or {WORDS_PER_MINUTE})"
+    )
+    parser.add_argument(
+        '--code-wpm',
+        type=int,
+        default=CODE_WORDS_PER_MINUTE,
+        help=f"Reading speed for code blocks (default: {CODE_WORDS_PER_MINUTE})"
+    )
+    parser.add_argument(
+        '--rpm',
+        type=int,
+        default=int(os.getenv('LLM_REQUESTS_PER_MINUTE', '0')) or None,
+        help="LLM requests per minute budget (default: $LLM_REQUESTS_PER_MINUTE or unlimited)"
+    )
+    parser.add_argument(
+        '--tpm',
+        type=int,
+        default=int(os.getenv('LLM_TOKENS_PER_MINUTE', '0')) or None,
+        help="LLM tokens per minute budget (default: $LLM_TOKENS_PER_MINUTE or unlimited)"
+    )
+    parser.add_argument(
+        '--max-attempts',
+        type=int,
+        default=int(os.getenv('LLM_MAX_ATTEMPTS', '3')),
+        help="Attempts per topic before it counts as failed; rate limit errors "
+             "get twice as many (default: $LLM_MAX_ATTEMPTS or 3)"
+    )
+    parser.add_argument(
+        '--retry-delay',
+        type=float,
+        default=2.0,
+        help="Delay before the first retry in seconds, doubled on every "
+             "further attempt and jittered (default: 2)"
+    )
+    parser.add_argument(
+        '--on-failure',
+        choices=FAILURE_MODES,
+        default='placeholder',
+        help="What to do with topics that still fail after retries: insert "
+             "placeholder content, or skip them and list them in a "
+             "<output>.failed.json topics file (default: placeholder)"
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=os.getenv('ARTICLE_CACHE_DIR', '.article_cache'),
+        help="Directory of the LLM response cache "
+             "(default: $ARTICLE_CACHE_DIR or .article_cache)"
+    )
+    parser.add_argument(
+        '--cache-max-mb',
+        type=int,
+        default=int(os.getenv('ARTICLE_CACHE_MAX_MB', '512')),
+        help="Size limit of the LLM response cache in MB "
+             "(default: $ARTICLE_CACHE_MAX_MB or 512)"
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="Neither read nor write the LLM response cache"
+    )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help="Regenerate every topic, overwriting cached responses"
+    )
+    parser.add_argument(
+        '--resume',
+        metavar='RUN_ID',
+        help="Resume an interrupted run, skipping topics its journal lists as completed"
+    )
+    parser.add_argument(
+        '--only-new',
+        action='store_true',
+        help="Only generate topics that have no article yet in the earlier runs' "
+             "SQL files and journals in this directory (and the --db-url database)"
+    )
+    parser.add_argument(
+        '--published',
+        action='append',
+        default=[],
+        metavar='SOURCE',
+        help="With --only-new, look for existing articles in SOURCE instead: an "
+             "articles_insert_*.sql file, a journal, a directory of them, or a "
+             "database URL (repeatable)"
+    )
+    parser.add_argument(
+        '--format',
+        choices=OUTPUT_FORMATS,
+        default='sql',
+        dest='output_format',
+        help="Output format: INSERT statements (sql), or a psql COPY script "
+             "with text (copy) or CSV (csv) data (default: sql)"
+    )
+    parser.add_argument(
+        '--db-url',
+        default=os.getenv('ARTICLE_DB_URL'),
+        help="Load rows directly into a database instead of writing a SQL file, "
+             "e.g. sqlite:///articles.db or postgresql://user@host/db "
+             "(default: $ARTICLE_DB_URL)"
+    )
+    parser.add_argument(
+        '--db-batch-size',
+        type=int,
+        default=10,
+        help="Rows inserted per database batch (default: 10)"
+    )
+    parser.add_argument(
+        '--db-copy',
+        action='store_true',
+        help="Load PostgreSQL batches with COPY instead of multi-row INSERTs"
+    )
+    parser.add_argument(
+        '--rows-per-statement',
+        type=int,
+        metavar='N',
+        help="Split the output into INSERT statements of at most N rows "
+             "(default: one statement for all rows)"
+    )
+    parser.add_argument(
+        '--transaction-per-statement',
+        action='store_true',
+        help="Wrap each INSERT statement in its own BEGIN/COMMIT"
+    )
+    parser.add_argument(
+        '--postprocess-workers',
+        type=int,
+        default=int(os.getenv('ARTICLE_POSTPROCESS_WORKERS', '0')),
+        metavar='N',
+        help="Worker processes for reading time, escaping and row formatting "
+             "(default: 0, done in the generating threads)"
+    )
+    parser.add_argument(
+        '--topics-per-request',
+        type=int,
+        default=int(os.getenv('ARTICLE_TOPICS_PER_REQUEST', '1')),
+        metavar='N',
+        help="Request the articles of N topics in one LLM call, re-queueing those "
+             "that come back invalid (single strategy only, default: 1)"
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help="Stream article responses, abandoning malformed or off-topic output early"
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=int(os.getenv('ARTICLE_METRICS_PORT')) if os.getenv('ARTICLE_METRICS_PORT') else None,
+        help="Serve Prometheus metrics on this port at /metrics while the batch runs "
+             "(default: $ARTICLE_METRICS_PORT)"
+    )
+    parser.add_argument(
+        '--metrics-address',
+        default=os.getenv('ARTICLE_METRICS_ADDRESS', '127.0.0.1'),
+        help="Address the metrics server binds; 0.0.0.0 exposes it on all interfaces "
+             "(default: $ARTICLE_METRICS_ADDRESS or 127.0.0.1)"
+    )
+    parser.add_argument(
+        '--metrics-textfile',
+        default=os.getenv('ARTICLE_METRICS_TEXTFILE'),
+        metavar='FILE',
+        help="Periodically write Prometheus metrics to FILE for the node_exporter "
+             "textfile collector (default: $ARTICLE_METRICS_TEXTFILE)"
+    )
+    parser.add_argument(
+        '--metrics-interval',
+        type=float,
+        default=15.0,
+        help="Seconds between metrics textfile updates (default: 15)"
+    )
+    parser.add_argument(
+        '--report',
+        metavar='FILE',
+        help="Write the JSON run report (stage timings, token estimates, slowest "
+             "topics) to FILE (default: articles_insert_<run>.report.json)"
+    )
+    args = parser.parse_args(argv)
+    if args.strategy != 'single' and (args.stream or args.topics_per_request > 1):
+        parser.error("--stream and --topics-per-request require --strategy single")
+    return args
 
 
 def main():
     """Main function to run the article generator."""
+    args = parse_args()
+    
     print("=" * 80)
     print("ML Article Generator - SQL Insert Query Builder")
     print("=" * 80)
@@ -285,38 +2313,196 @@ def main():
     model_name = os.getenv('LLM_MODEL_NAME', 'anthropic.claude-sonnet-4-20250514-v1-0')
     
     print(f"\n🤖 Using LLM Model: {model_name}")
+    if args.fast_model:
+        print(f"   ⚡ Short fields from: {args.fast_model}")
     
-    # Check for input file
-    if len(sys.argv) > 1:
-        input_file = sys.argv[1]
-    else:
-        input_file = 'topics.json'
+    # Each run is identified by the timestamp of its output file
+    run_id = args.resume or datetime.now().strftime('%Y%m%d_%H%M%S')
+    journal = RunJournal(RunJournal.path_for_run(run_id))
+    
+    input_files = args.input_files
+    if args.resume:
+        if not journal.exists():
+            print(f"\n❌ Error: No journal found for run '{run_id}' ({journal.path})")
+            sys.exit(1)
+        start = journal.load()['start'] or {}
+        # Journals of older runs name a single input file
+        resumed_inputs = start.get('input_files') or ([start['input_file']] if start.get('input_file') else [])
+        input_files = input_files or resumed_inputs
+        print(f"\n🔁 Resuming run: {run_id}")
     
-    if not os.path.exists(input_file):
-        print(f"\n❌ Error: Input file '{input_file}' not found!")
-        print(f"Usage: python article_generator.py [topics_file.json]")
+    # Check for input files
+    input_files = input_files or ['topics.json']
+    
+    missing = [path for path in input_files if not os.path.exists(path)]
+    if missing:
+        print(f"\n❌ Error: Input file '{missing[0]}' not found!")
+        print(f"Usage: python article_generator.py [topics_file.json | topics_dir ...] [--workers N] [--resume RUN_ID]")
         print(f"Using default: topics.json")
         sys.exit(1)
     
-    # Load topics
-    print(f"\n📖 Loading topics from: {input_file}")
-    topics = load_topics_from_file(input_file)
-    print(f"   Found {len(topics)} topics to process")
+    topic_files = expand_inputs(input_files)
+    if not topic_files:
+        print(f"\n❌ Error: No topics files found in: {', '.join(input_files)}")
+        sys.exit(1)
+    
+    # Topics are read lazily as the batch needs them, so generation starts
+    # right away and large catalogues are never held in memory
+    print(f"\n📖 Streaming topics from: {', '.join(topic_files)}")
+    topics = TopicStream(*topic_files)
     
     # Initialize generator
-    generator = ArticleGenerator(model_name=model_name)
+    cache = None
+    if not args.no_cache:
+        cache = LLMCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+        print(f"   💾 Caching LLM responses in: {args.cache_dir}")
+    
+    # Runs at up to one call per worker (per section with the sections
+    # strategy) concurrently, backing off when throttled
+    calls_per_topic = len(ARTICLE_SECTIONS) if args.strategy == 'sections' else 1
+    rate_limiter = AdaptiveRateLimiter(
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        max_concurrency=args.workers * calls_per_topic
+    )
     
-    # Generate SQL
-    sql_output = generator.generate_batch_sql(topics, created_by=created_by_uuid)
+    metrics = None
+    if args.metrics_port is not None or args.metrics_textfile:
+        metrics = GeneratorMetrics()
+        metrics.add_callback_metric(
+            Gauge, 'article_generator_topics', "Topics read from the input so far", lambda: topics.count
+        )
+        metrics.add_callback_metric(
+            Gauge, 'article_generator_llm_concurrency_limit',
+            "Concurrent LLM calls currently allowed by the adaptive rate limiter",
+            lambda: rate_limiter.concurrency_limit
+        )
     
-    # Save to file
-    output_file = f"articles_insert_{datetime.now().strftime('%Y%m%d_%H%M%S')}.sql"
-    with open(output_file, 'w') as f:
-        f.write(sql_output)
+    generator = ArticleGenerator(
+        model_name=model_name,
+        cache=cache,
+        refresh_cache=args.refresh,
+        rate_limiter=rate_limiter,
+        retry_policy=RetryPolicy(max_attempts=args.max_attempts, base_delay=args.retry_delay),
+        on_failure=args.on_failure,
+        generation_strategy=args.strategy,
+        model_routing={'metadata': args.fast_model} if args.fast_model else None,
+        words_per_minute=args.wpm,
+        code_words_per_minute=args.code_wpm,
+        metrics=metrics,
+        stream=args.stream,
+        topics_per_request=args.topics_per_request,
+        postprocess_workers=args.postprocess_workers
+    )
+    
+    # Generate SQL, streaming each row to the output file (or database) as it
+    # completes. A resumed run rewrites the whole file from the journal plus new rows.
+    output_file = f"articles_insert_{run_id}.sql"
+    if args.db_url:
+        print(f"\n🗄️  Loading rows into: {args.db_url}")
+    else:
+        print(f"\n📄 Writing SQL output to: {output_file}")
+    print(f"   📓 Journal: {journal.path} (resume with --resume {run_id})")
+    
+    # Index the published articles before this run's output file is rewritten
+    if args.only_new:
+        sources = args.published or output_files() + ([args.db_url] if args.db_url else [])
+        own_files = {os.path.abspath(output_file), os.path.abspath(journal.path)}
+        published = PublishedIndex()
+        try:
+            for source in sources:
+                if os.path.abspath(source) not in own_files:
+                    published.load(source)
+        except (OSError, ValueError, ImportError) as e:
+            print(f"\n❌ Error: Could not read the published articles: {e}")
+            sys.exit(1)
+        print(f"   🔎 Indexed {len(published.names)} published topics and {len(published.titles)} titles "
+              f"from {len(published.sources)} source{'s' if len(published.sources) != 1 else ''}")
+        batch_topics = published.new_topics(topics)
+    else:
+        published = None
+        batch_topics = topics
+    
+    journal.record_start(
+        input_files=input_files,
+        model_name=model_name,
+        resumed=bool(args.resume)
+    )
+    
+    if args.db_url:
+        writer = open_loader(args.db_url, batch_size=args.db_batch_size, use_copy=args.db_copy)
+    else:
+        writer = open_writer(
+            output_file,
+            args.output_format,
+            rows_per_statement=args.rows_per_statement,
+            transaction_per_statement=args.transaction_per_statement
+        )
+    
+    exporters = []
+    if metrics is not None:
+        metrics.add_callback_metric(
+            Counter, 'article_generator_rows_written_total', "Rows written to the output",
+            lambda: writer.rows_written
+        )
+        metrics.add_callback_metric(
+            Counter, 'article_generator_sql_bytes_written_total', "Bytes of row data written to the output",
+            lambda: writer.bytes_written
+        )
+        if args.metrics_port is not None:
+            exporters.append(MetricsHTTPServer(metrics.registry, args.metrics_port, args.metrics_address))
+            host = 'localhost' if args.metrics_address in ('', '0.0.0.0', '127.0.0.1') else args.metrics_address
+            print(f"   📈 Metrics: http://{host}:{exporters[-1].port}/metrics")
+        if args.metrics_textfile:
+            exporters.append(TextfileExporter(metrics.registry, args.metrics_textfile, args.metrics_interval))
+            print(f"   📈 Metrics file: {args.metrics_textfile}")
+    
+    try:
+        with writer:
+            generator.write_batch_sql(
+                batch_topics,
+                writer,
+                created_by=created_by_uuid,
+                max_workers=args.workers,
+                journal=journal
+            )
+    finally:
+        for exporter in exporters:
+            exporter.close()
+    
+    if published is not None:
+        print(f"\n⏭️  Skipped {published.skipped} already published topic{'s' if published.skipped != 1 else ''}")
+    if topics.duplicates:
+        count = len(topics.duplicates)
+        print(f"\n🔂 Skipped {count} topic{'s' if count != 1 else ''} repeating one already read:")
+        for skipped, kept in topics.duplicates:
+            print(f"   - {skipped} (same as: {kept})")
+    
+    # Save failed topics in topics-file format so they can be rerun directly
+    if generator.failed_topics:
+        failed_names = {failure['topic'] for failure in generator.failed_topics}
+        failed_file = f"articles_insert_{run_id}.failed.json"
+        with open(failed_file, 'w') as f:
+            json.dump(
+                {'topics': [topic for topic in TopicStream(*topic_files) if topic['name'] in failed_names]},
+                f,
+                indent=2,
+                ensure_ascii=False
+            )
+        print(f"\n⚠️  Failed topics saved to: {failed_file}")
+    
+    report_file = args.report or f"articles_insert_{run_id}.report.json"
+    report = generator.instrumentation.write_report(report_file)
+    print(f"\n📊 Run report saved to: {report_file}")
+    print(f"   {report['llm']['calls']} LLM calls, ~{report['llm']['prompt_tokens_estimate']} prompt + "
+          f"~{report['llm']['response_tokens_estimate']} response tokens in {report['wall_seconds']:.0f}s")
     
-    print(f"\n📄 SQL output saved to: {output_file}")
     print(f"\n{'=' * 80}")
-    print("Done! You can now run this SQL file against your database.")
+    if args.db_url:
+        print(f"Done! Loaded {writer.rows_written} rows into the database.")
+    else:
+        print(f"📄 SQL output saved to: {output_file}")
+        print("Done! You can now run this SQL file against your database.")
     print(f"{'=' * 80}\n")
 
 
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Throughput Benchmark for the Article Generator
+Runs generate_batch_sql end to end against the fake LLM backend and reports
+articles/sec, p50/p99 article latency and peak RSS per scenario.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from article_generator import (
+    GENERATION_STRATEGIES,
+    ArticleGenerator,
+    AsyncArticleGenerator,
+    load_topics_from_file,
+)
+from llm_backends import FakeLLMBackend
+from llm_cache import LLMCache
+from rate_limiter import AdaptiveRateLimiter
+from retry_policy import RetryPolicy
+
+
+DEFAULT_TOPIC_FILES = ('ml_topics.json', 'rl_topics.json', 'genai_topics.json')
+DEFAULT_SYNTHETIC_SIZES = (10000,)
+
+
+def synthetic_topics(count: int) -> List[Dict]:
+    """
+    Build a list of distinct synthetic topics.
+
+    Args:
+        count: Number of topics
+
+    Returns:
+        Topic dictionaries in the topics file format
+    """
+    return [
+        {'name': f"Synthetic Topic {i}", 'tags': ['Benchmark'], 'is_premium': False, 'views': 0}
+        for i in range(count)
+    ]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of a list of values.
+
+    Args:
+        values: Measured values
+        fraction: Percentile as a fraction, e.g. 0.99
+
+    Returns:
+        The percentile, or 0.0 for an empty list
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_scenario(name: str, topics: List[Dict], options: Dict) -> Dict:
+    """
+    Generate one batch and measure it.
+
+    Meant to run in a fresh process so the peak RSS belongs to this scenario.
+
+    Args:
+        name: Scenario name
+        topics: Topics to generate
+        options: Benchmark options (see parse_args)
+
+    Returns:
+        Measurements of the scenario
+    """
+    backend = FakeLLMBackend(
+        latency=options['latency'],
+        latency_sigma=options['latency_sigma'],
+        failure_rate=options['failure_rate'],
+        throttle_rate=options['throttle_rate'],
+        malformed_rate=options['malformed_rate'],
+        off_topic_rate=options['off_topic_rate'],
+        response_words=options['response_words'],
+        seed=options['seed']
+    )
+    generator_options = {
+        'backend': backend,
+        'generation_strategy': options['strategy'],
+        'stream': options['stream'],
+        'topics_per_request': options['topics_per_request'],
+        'postprocess_workers': options['postprocess_workers'],
+        'rate_limiter': AdaptiveRateLimiter(
+            requests_per_minute=options['rpm'],
+            max_concurrency=options['workers'] * (10 if options['strategy'] == 'sections' else 1),
+            cooldown_seconds=options['cooldown']
+        ),
+        'retry_policy': RetryPolicy(max_attempts=options['max_attempts'], base_delay=options['retry_delay']),
+        'cache': LLMCache(options['cache_dir']) if options['cache_dir'] else None,
+    }
+    if options['fast_model']:
+        generator_options['model_routing'] = {'metadata': options['fast_model']}
+
+    if options['use_async']:
+        generator = AsyncArticleGenerator(**generator_options)
+    else:
+        generator = ArticleGenerator(**generator_options)
+
+    # The generator's progress output would dominate large runs
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        if options['use_async']:
+            sql = asyncio.run(generator.generate_batch_sql_async(topics, max_concurrency=options['workers']))
+        else:
+            sql = generator.generate_batch_sql(topics, max_workers=options['workers'])
+        elapsed = time.perf_counter() - start
+
+    # Topics requested together are timed from the start of their shared request
+    latencies = [trace.elapsed for trace in generator.instrumentation.traces]
+    return {
+        'scenario': name,
+        'topics': len(topics),
+        'articles': len(topics) - (len(generator.failed_topics) if generator.on_failure == 'skip' else 0),
+        'failed': len(generator.failed_topics),
+        'llm_calls': backend.calls,
+        'prefix_cache_hits': backend.prefix_cache_hits,
+        'elapsed_seconds': round(elapsed, 3),
+        'articles_per_second': round(len(topics) / elapsed, 2) if elapsed > 0 else 0.0,
+        'p50_latency_seconds': round(percentile(latencies, 0.50), 4),
+        'p99_latency_seconds': round(percentile(latencies, 0.99), 4),
+        'sql_mb': round(len(sql.encode('utf-8')) / (1024 * 1024), 2),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'stage_seconds': {
+            stage: summary['total'] for stage, summary in generator.instrumentation.report()['stage_seconds'].items()
+        },
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Argument list (default: sys.argv[1:])
+
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the article generator against a fake LLM backend."
+    )
+    parser.add_argument(
+        'topic_files', nargs='*', default=list(DEFAULT_TOPIC_FILES),
+        help=f"Topic files to benchmark (default: {' '.join(DEFAULT_TOPIC_FILES)})"
+    )
+    parser.add_argument(
+        '--synthetic', type=int, nargs='*', default=list(DEFAULT_SYNTHETIC_SIZES), metavar='N',
+        help="Sizes of synthetic topic lists to benchmark (default: 10000; pass no value to skip)"
+    )
+    parser.add_argument('-w', '--workers', type=int, default=16, help="Concurrent generations (default: 16)")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="Benchmark AsyncArticleGenerator instead of the thread pool")
+    parser.add_argument('--strategy', choices=GENERATION_STRATEGIES, default='single',
+                        help="Generation strategy (default: single)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Stream article responses (threaded generator only)")
+    parser.add_argument('--topics-per-request', type=int, default=1, metavar='N',
+                        help="Topics requested per LLM call (threaded generator only, default: 1)")
+    parser.add_argument('--postprocess-workers', type=int, default=0, metavar='N',
+                        help="Worker processes finishing rows (default: 0, inline)")
+    parser.add_argument('--fast-model', default=None, help="Route metadata fields to this model")
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help="Median fake LLM latency in seconds (default: 0.05)")
+    parser.add_argument('--latency-sigma', type=float, default=0.5,
+                        help="Log-normal spread of the fake latency (default: 0.5)")
+    parser.add_argument('--failure-rate', type=float, default=0.0,
+                        help="Fraction of fake LLM calls that fail (default: 0)")
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help="Fraction of fake LLM calls that fail with a 429 (default: 0)")
+    parser.add_argument('--malformed-rate', type=float, default=0.0,
+                        help="Fraction of fake responses needing JSON repair (default: 0)")
+    parser.add_argument('--off-topic-rate', type=float, default=0.0,
+                        help="Fraction of fake responses about an unrelated topic (default: 0)")
+    parser.add_argument('--response-words', type=int, default=2000,
+                        help="Words of content per fake article (default: 2000)")
+    parser.add_argument('--rpm', type=int, default=None, help="Requests per minute limit (default: unlimited)")
+    parser.add_argument('--cooldown', type=float, default=0.5,
+                        help="Rate limiter cooldown after a 429 in seconds (default: 0.5)")
+    parser.add_argument('--max-attempts', type=int, default=3, help="Attempts per article (default: 3)")
+    parser.add_argument('--retry-delay', type=float, default=0.01,
+                        help="Base retry backoff in seconds (default: 0.01)")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Use a response cache in this directory (default: no cache)")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed of the fake backend (default: 42)")
+    parser.add_argument('--json', dest='json_output', default=None, metavar='FILE',
+                        help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+    if args.use_async and (args.stream or args.topics_per_request > 1):
+        parser.error("--stream and --topics-per-request apply to the threaded generator only")
+    if args.strategy != 'single' and (args.stream or args.topics_per_request > 1):
+        parser.error("--stream and --topics-per-request require --strategy single")
+    return args
+
+
+def main():
+    """Main benchmark function."""
+    args = parse_args()
+    options = vars(args)
+
+    scenarios = []
+    for filepath in args.topic_files:
+        if not os.path.exists(filepath):
+            print(f"❌ Error: Input file '{filepath}' not found")
+            sys.exit(1)
+        scenarios.append((os.path.basename(filepath), load_topics_from_file(filepath)))
+    for size in args.synthetic:
+        scenarios.append((f"synthetic-{size}", synthetic_topics(size)))
+
+    mode = 'async' if args.use_async else 'threads'
+    print(f"🏁 Benchmarking {len(scenarios)} scenarios ({mode}, {args.workers} workers, "
+          f"{args.latency}s median latency, strategy '{args.strategy}')\n")
+    print(f"{'scenario':<22} {'topics':>7} {'failed':>6} {'art/s':>9} {'p50 s':>8} {'p99 s':>8} {'RSS MB':>8}")
+
+    results = []
+    for name, topics in scenarios:
+        # A fresh process per scenario keeps peak RSS measurements independent
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            result = executor.submit(run_scenario, name, topics, options).result()
+        results.append(result)
+        print(f"{result['scenario']:<22} {result['topics']:>7} {result['failed']:>6} "
+              f"{result['articles_per_second']:>9.2f} {result['p50_latency_seconds']:>8.3f} "
+              f"{result['p99_latency_seconds']:>8.3f} {result['peak_rss_mb']:>8.1f}")
+
+    if args.json_output:
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump({'options': options, 'results': results}, f, indent=2)
+        print(f"\n📊 Results written to: {args.json_output}")
+
+
+if __name__ == "__main__":
+    main()
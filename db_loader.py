@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Direct database loading for the article generator.
+Generated rows are inserted with parameterized batch statements as they are produced,
+instead of being serialized to SQL text and re-parsed by psql.
+"""
+
+import io
+import json
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from instrumentation import stage
+from sql_writer import ARTICLE_COLUMNS, RecordWriter, format_copy_line
+
+try:
+    import psycopg2
+    import psycopg2.extras
+    import psycopg2.pool
+except ImportError:
+    psycopg2 = None
+
+
+# SQLite version of the articles table from the README. UUIDs are stored as
+# text, tags as a JSON array and booleans as integers.
+SQLITE_SCHEMA = """CREATE TABLE IF NOT EXISTS articles (
+  id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+  title TEXT NOT NULL,
+  content TEXT NOT NULL,
+  excerpt TEXT,
+  summary TEXT,
+  summary_title TEXT,
+  featured_image TEXT,
+  reading_time INTEGER,
+  tags TEXT DEFAULT '[]',
+  is_premium INTEGER DEFAULT 0,
+  views INTEGER DEFAULT 0,
+  created_by TEXT,
+  created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+  updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+)"""
+
+
+class ArticleLoader(RecordWriter):
+    """Base class of loaders that insert article records in batches."""
+
+    keeps_rows = True
+
+    def __init__(self, batch_size: int = 10):
+        """
+        Initialize the loader.
+
+        Args:
+            batch_size: Number of records inserted per batch
+        """
+        self.batch_size = max(1, batch_size)
+        self.rows_written = 0
+        self.closed = False
+        # Called with each batch of records once it is committed
+        self.on_commit: Optional[Callable[[List[Dict]], None]] = None
+        self._pending: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def write_record(self, record: Dict) -> None:
+        """
+        Queue one article record, inserting the batch once it is full.
+
+        Args:
+            record: Column values keyed by ARTICLE_COLUMNS
+        """
+        with self._lock:
+            self._pending.append(record)
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, []
+
+        # The whole batch is attributed to the topic that filled it
+        with stage('sql'):
+            self._commit(batch)
+
+    def flush(self) -> None:
+        """Insert any queued records."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._commit(batch)
+
+    def _commit(self, batch: List[Dict]) -> None:
+        self.insert_batch(batch)
+        if self.on_commit is not None:
+            self.on_commit(batch)
+
+    def insert_batch(self, records: List[Dict]) -> None:
+        """
+        Insert and commit a batch of records.
+
+        Args:
+            records: Article records
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Insert queued records and release the connection."""
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+
+
+class SQLiteArticleLoader(ArticleLoader):
+    """Load article records into a SQLite database, e.g. for local tests."""
+
+    def __init__(self, path: str, batch_size: int = 10):
+        """
+        Initialize the loader and create the articles table if needed.
+
+        Args:
+            path: SQLite database file (':memory:' for an in-memory database)
+            batch_size: Number of records inserted per batch
+        """
+        super().__init__(batch_size=batch_size)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(SQLITE_SCHEMA)
+        self.connection.commit()
+        self._db_lock = threading.Lock()
+
+    def insert_batch(self, records: List[Dict]) -> None:
+        """
+        Insert and commit a batch of records.
+
+        Args:
+            records: Article records
+        """
+        placeholders = ', '.join('?' for _ in ARTICLE_COLUMNS)
+        sql = f"INSERT INTO articles ({', '.join(ARTICLE_COLUMNS)}) VALUES ({placeholders})"
+        params = [
+            tuple(
+                json.dumps(record[column]) if column == 'tags'
+                else int(record[column]) if column == 'is_premium'
+                else record[column]
+                for column in ARTICLE_COLUMNS
+            )
+            for record in records
+        ]
+
+        with self._db_lock:
+            with self.connection:
+                self.connection.executemany(sql, params)
+            self.rows_written += len(records)
+
+    def close(self) -> None:
+        """Insert queued records and close the database."""
+        if self.closed:
+            return
+        super().close()
+        self.connection.close()
+
+
+class PostgresArticleLoader(ArticleLoader):
+    """Load article records into PostgreSQL through a connection pool."""
+
+    def __init__(self, dsn: str, batch_size: int = 10, pool_size: int = 4, use_copy: bool = False):
+        """
+        Initialize the loader.
+
+        Args:
+            dsn: PostgreSQL connection string
+            batch_size: Number of records inserted per batch
+            pool_size: Maximum number of pooled connections
+            use_copy: Load batches with COPY instead of multi-row INSERTs
+        """
+        if psycopg2 is None:
+            raise ImportError(
+                "PostgreSQL loading requires psycopg2. Install it with: pip install psycopg2-binary"
+            )
+        super().__init__(batch_size=batch_size)
+        self.use_copy = use_copy
+        self.pool = psycopg2.pool.ThreadedConnectionPool(1, max(1, pool_size), dsn)
+        self._count_lock = threading.Lock()
+
+    def insert_batch(self, records: List[Dict]) -> None:
+        """
+        Insert and commit a batch of records.
+
+        Args:
+            records: Article records
+        """
+        columns = ', '.join(ARTICLE_COLUMNS)
+        connection = self.pool.getconn()
+        try:
+            with connection:
+                with connection.cursor() as cursor:
+                    if self.use_copy:
+                        data = io.StringIO(''.join(format_copy_line(record) for record in records))
+                        cursor.copy_expert(f"COPY articles ({columns}) FROM STDIN", data)
+                    else:
+                        # psycopg2 adapts the Python list of tags to a text[] array
+                        psycopg2.extras.execute_values(
+                            cursor,
+                            f"INSERT INTO articles ({columns}) VALUES %s",
+                            [tuple(record[column] for column in ARTICLE_COLUMNS) for record in records]
+                        )
+        finally:
+            self.pool.putconn(connection)
+
+        with self._count_lock:
+            self.rows_written += len(records)
+
+    def close(self) -> None:
+        """Insert queued records and close all pooled connections."""
+        if self.closed:
+            return
+        super().close()
+        self.pool.closeall()
+
+
+def open_loader(db_url: str, **options) -> ArticleLoader:
+    """
+    Create a loader for a database URL.
+
+    Args:
+        db_url: 'sqlite:///path/to/file.db' or a 'postgresql://' connection URL
+        **options: Loader options, e.g. batch_size
+
+    Returns:
+        Loader for the database
+    """
+    if db_url.startswith('sqlite://'):
+        options.pop('pool_size', None)
+        options.pop('use_copy', None)
+        return SQLiteArticleLoader(db_url[len('sqlite:///'):] or ':memory:', **options)
+    if db_url.startswith(('postgresql://', 'postgres://')):
+        return PostgresArticleLoader(db_url, **options)
+    raise ValueError(f"Unsupported database URL: {db_url}")
+
+
+def iter_article_titles(db_url: str) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Read the titles of the articles already in a database.
+
+    A SQLite file or articles table that does not exist yet holds no
+    articles.
+
+    Args:
+        db_url: 'sqlite:///path/to/file.db' or a 'postgresql://' connection URL
+
+    Yields:
+        Tuples of each article's title and summary title
+    """
+    query = "SELECT title, summary_title FROM articles"
+    if db_url.startswith('sqlite://'):
+        path = db_url[len('sqlite:///'):]
+        if not path or not os.path.exists(path):
+            return
+        connection = sqlite3.connect(path)
+        try:
+            try:
+                rows = connection.execute(query)
+            except sqlite3.OperationalError:
+                # No articles table yet
+                return
+            yield from rows
+        finally:
+            connection.close()
+        return
+    if db_url.startswith(('postgresql://', 'postgres://')):
+        if psycopg2 is None:
+            raise ImportError(
+                "PostgreSQL loading requires psycopg2. Install it with: pip install psycopg2-binary"
+            )
+        connection = psycopg2.connect(db_url)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT to_regclass('articles') IS NOT NULL")
+                if not cursor.fetchone()[0]:
+                    return
+                cursor.execute(query)
+                yield from cursor
+        finally:
+            connection.close()
+        return
+    raise ValueError(f"Unsupported database URL: {db_url}")
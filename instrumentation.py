@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Per-topic instrumentation for the article generator.
+Times each stage of an article (prompt build, cache lookup, rate limiter wait, LLM
+call, JSON parse, validation, escaping and SQL output), counts prompt and response
+sizes with estimated tokens, and summarizes a run as a JSON report.
+"""
+
+import contextvars
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from rate_limiter import estimate_tokens
+
+
+STAGES = ('prompt', 'cache', 'wait', 'llm', 'parse', 'validate', 'escape', 'sql')
+
+# Trace of the topic the current thread or task is working on
+_current_trace = contextvars.ContextVar('article_trace', default=None)
+
+# Serializes progress lines written from many generation threads
+_output_lock = threading.Lock()
+
+
+class TopicTrace:
+    """Timings and sizes of one topic."""
+
+    def __init__(self, topic: str, index: int = 0, total: int = 0):
+        """
+        Initialize the trace.
+
+        Args:
+            topic: Article topic
+            index: Position of the topic in the batch (1-based)
+            total: Number of topics in the batch
+        """
+        self.topic = topic
+        self.index = index
+        self.total = total
+        self.status = 'completed'
+        self.cached = False
+        self.elapsed = 0.0
+        self.stages: Dict[str, float] = {stage: 0.0 for stage in STAGES}
+        self.llm_calls = 0
+        self.prompt_chars = 0
+        self.response_chars = 0
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+        self.cacheable_prompt_tokens = 0
+        self._lock = threading.Lock()
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        """
+        Add time spent in a stage.
+
+        Args:
+            stage: Stage name from STAGES
+            seconds: Elapsed time
+        """
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_llm_call(self, prompt: str, response: str, prefix_length: int = 0) -> None:
+        """
+        Count one LLM call and its sizes.
+
+        Args:
+            prompt: Prompt text
+            response: Response text
+            prefix_length: Characters of the prompt's cacheable instruction prefix
+        """
+        with self._lock:
+            self.llm_calls += 1
+            self.prompt_chars += len(prompt)
+            self.response_chars += len(response)
+            self.prompt_tokens += estimate_tokens(prompt)
+            self.response_tokens += estimate_tokens(response) if response else 0
+            self.cacheable_prompt_tokens += estimate_tokens(prompt[:prefix_length]) if prefix_length else 0
+
+    def add_share(self, shared: 'TopicTrace', share: float) -> None:
+        """
+        Add a share of a request made for several topics at once.
+
+        Args:
+            shared: Trace of the shared request
+            share: Fraction attributed to this topic
+        """
+        with self._lock:
+            for name, seconds in shared.stages.items():
+                self.stages[name] = self.stages.get(name, 0.0) + seconds * share
+            self.llm_calls += shared.llm_calls * share
+            self.prompt_chars += shared.prompt_chars * share
+            self.response_chars += shared.response_chars * share
+            self.prompt_tokens += shared.prompt_tokens * share
+            self.response_tokens += shared.response_tokens * share
+            self.cacheable_prompt_tokens += shared.cacheable_prompt_tokens * share
+
+    def to_dict(self) -> Dict:
+        """Trace as a JSON-serializable dictionary."""
+        return {
+            'topic': self.topic,
+            'status': self.status,
+            'cached': self.cached,
+            'elapsed_seconds': round(self.elapsed, 4),
+            'stages': {stage: round(seconds, 4) for stage, seconds in self.stages.items()},
+            'llm_calls': round(self.llm_calls, 3),
+            'prompt_chars': round(self.prompt_chars),
+            'response_chars': round(self.response_chars),
+            'prompt_tokens_estimate': round(self.prompt_tokens),
+            'response_tokens_estimate': round(self.response_tokens),
+            'cacheable_prompt_tokens_estimate': round(self.cacheable_prompt_tokens),
+        }
+
+    def summary_line(self) -> str:
+        """One-line progress summary of the finished topic."""
+        position = f"[{self.index}/{self.total}]" if self.total else f"[{self.index}]"
+        return (
+            f"{position} {self.status:<9} {self.elapsed:7.1f}s  llm={self.stages['llm']:.1f}s "
+            f"calls={self.llm_calls:g} tokens~{round(self.prompt_tokens + self.response_tokens)}  {self.topic}"
+        )
+
+
+def current_trace() -> Optional[TopicTrace]:
+    """Trace of the topic being generated in this context, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def tracing(trace: Optional[TopicTrace]):
+    """
+    Attribute the stages run inside the block to a trace.
+
+    Args:
+        trace: Topic trace, or None to attribute nothing
+    """
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def add_stage(stage: str, seconds: float) -> None:
+    """
+    Add time to a stage of the current trace, if any.
+
+    Args:
+        stage: Stage name from STAGES
+        seconds: Elapsed time
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_stage(stage, seconds)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time the block as a stage of the current trace, if any.
+
+    Args:
+        name: Stage name from STAGES
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_stage(name, time.perf_counter() - start)
+
+
+def record_llm_call(prompt: str, response: str, prefix_length: int = 0) -> None:
+    """
+    Count an LLM call in the current trace, if any.
+
+    Args:
+        prompt: Prompt text
+        response: Response text
+        prefix_length: Characters of the prompt's cacheable instruction prefix
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_llm_call(prompt, response, prefix_length)
+
+
+def _distribution(values: List[float]) -> Dict:
+    if not values:
+        return {'total': 0.0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    ordered = sorted(values)
+
+    def rank(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+    return {
+        'total': round(sum(ordered), 4),
+        'mean': round(sum(ordered) / len(ordered), 4),
+        'p50': round(rank(0.50), 4),
+        'p95': round(rank(0.95), 4),
+        'max': round(ordered[-1], 4),
+    }
+
+
+class RunInstrumentation:
+    """Collect the traces of one batch and report on them."""
+
+    def __init__(self, verbose: bool = True):
+        """
+        Initialize the collector.
+
+        Args:
+            verbose: Print a one-line summary as each topic finishes
+        """
+        self.verbose = verbose
+        # Called with each finished topic's trace, e.g. to update metrics
+        self.listeners: List[Callable[[TopicTrace], None]] = []
+        self.traces: List[TopicTrace] = []
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        # Per-stage stats of the batch pipeline, if the batch ran on one
+        self.pipeline: Optional[Dict] = None
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Forget the traces of a previous batch."""
+        with self._lock:
+            self.traces = []
+            self.started = time.time()
+            self.finished = None
+            self.pipeline = None
+
+    def finish(self) -> None:
+        """Mark the end of the batch."""
+        self.finished = time.time()
+
+    @contextmanager
+    def trace_topic(self, topic: str, index: int = 0, total: int = 0, start: Optional[float] = None):
+        """
+        Trace the generation of one topic.
+
+        Stages timed inside the block, including in threads or tasks that
+        copy the current context, are attributed to the topic.
+
+        Args:
+            topic: Article topic
+            index: Position of the topic in the batch (1-based)
+            total: Number of topics in the batch
+            start: time.perf_counter() value the topic's elapsed time is
+                measured from (default: now), e.g. the start of a request
+                shared with other topics
+
+        Yields:
+            The topic's trace
+        """
+        trace = TopicTrace(topic, index=index, total=total)
+        with self._lock:
+            self.traces.append(trace)
+
+        start = start if start is not None else time.perf_counter()
+        try:
+            with tracing(trace):
+                yield trace
+        except BaseException:
+            trace.status = 'error'
+            raise
+        finally:
+            trace.elapsed = time.perf_counter() - start
+            if self.verbose:
+                # One write per line under a lock, so concurrent topics never
+                # interleave their lines
+                with _output_lock:
+                    sys.stdout.write(trace.summary_line() + '\n')
+            for listener in self.listeners:
+                listener(trace)
+
+    def report(self, slowest: int = 10) -> Dict:
+        """
+        Summarize the batch.
+
+        Stage times are summed over every call of a topic, so concurrent
+        section calls can add up to more than the topic's elapsed time.
+        Requests shared by several topics are split evenly between them.
+
+        Args:
+            slowest: Number of slowest topics to list
+
+        Returns:
+            JSON-serializable report
+        """
+        with self._lock:
+            traces = list(self.traces)
+        wall = (self.finished or time.time()) - self.started
+
+        statuses: Dict[str, int] = {}
+        for trace in traces:
+            statuses[trace.status] = statuses.get(trace.status, 0) + 1
+        generated = [trace for trace in traces if trace.llm_calls]
+
+        report = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'wall_seconds': round(wall, 3),
+            'topics': len(traces),
+            'statuses': statuses,
+            'cached': sum(1 for trace in traces if trace.cached),
+            'articles_per_second': round(len(traces) / wall, 3) if wall > 0 else 0.0,
+            'topic_seconds': _distribution([trace.elapsed for trace in traces]),
+            'stage_seconds': {
+                name: _distribution([trace.stages.get(name, 0.0) for trace in generated])
+                for name in STAGES
+            },
+            'llm': {
+                'calls': round(sum(trace.llm_calls for trace in traces)),
+                'prompt_chars': round(sum(trace.prompt_chars for trace in traces)),
+                'response_chars': round(sum(trace.response_chars for trace in traces)),
+                'prompt_tokens_estimate': round(sum(trace.prompt_tokens for trace in traces)),
+                'response_tokens_estimate': round(sum(trace.response_tokens for trace in traces)),
+                'cacheable_prompt_tokens_estimate': round(sum(trace.cacheable_prompt_tokens for trace in traces)),
+            },
+            'slowest_topics': [
+                trace.to_dict()
+                for trace in sorted(traces, key=lambda trace: trace.elapsed, reverse=True)[:slowest]
+            ],
+        }
+        if self.pipeline is not None:
+            report['pipeline'] = self.pipeline
+        return report
+
+    def write_report(self, filepath: str, slowest: int = 10) -> Dict:
+        """
+        Write the batch report as JSON.
+
+        Args:
+            filepath: Report file
+            slowest: Number of slowest topics to list
+
+        Returns:
+            The report
+        """
+        report = self.report(slowest=slowest)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return report
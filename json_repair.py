@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Tolerant JSON parsing for LLM responses.
+Extracts the outermost JSON object from a response and repairs the defects LLMs
+commonly produce: markdown fences, trailing prose, raw newlines and unescaped quotes
+inside strings, invalid escapes, trailing commas and truncated output. Streamed
+responses can be parsed field by field as they arrive.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+
+VALID_ESCAPES = '"\\/bfnrtu'
+
+
+def strip_code_fences(text: str) -> str:
+    """
+    Remove a markdown code fence wrapped around a response.
+
+    Args:
+        text: Raw response text
+
+    Returns:
+        Text without the surrounding fence
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        text = re.sub(r'^```[a-zA-Z]*\s*\n?', '', text)
+        text = re.sub(r'\n?```\s*$', '', text)
+    return text
+
+
+def extract_json_object(text: str, opening: str = '{') -> str:
+    """
+    Extract the outermost JSON object from text with surrounding prose.
+
+    Args:
+        text: Response text
+        opening: '{' for an object, '[' for an array
+
+    Returns:
+        Text from the first opening bracket to its matching closing one, or
+        to the end of the text if it is never closed
+
+    Raises:
+        ValueError: If the text contains no opening bracket
+    """
+    start = text.find(opening)
+    if start == -1:
+        kind = 'object' if opening == '{' else 'array'
+        raise ValueError(f"No JSON {kind} found in response")
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+
+    return text[start:]
+
+
+def _closes_string(text: str, i: int) -> bool:
+    # A quote ends a string only if what follows looks like JSON structure
+    j = i + 1
+    while j < len(text) and text[j] in ' \t\r\n':
+        j += 1
+    if j >= len(text):
+        return True
+    if text[j] in '}]:':
+        return True
+    if text[j] == ',':
+        k = j + 1
+        while k < len(text) and text[k] in ' \t\r\n':
+            k += 1
+        return k >= len(text) or text[k] in '"}]'
+    return False
+
+
+def repair_json(text: str) -> str:
+    """
+    Repair common defects in LLM-produced JSON.
+
+    Escapes raw control characters, stray quotes and invalid backslash
+    escapes inside strings, drops trailing commas, and closes strings,
+    arrays and objects left open by a truncated response.
+
+    Args:
+        text: JSON-like text
+
+    Returns:
+        Repaired JSON text
+    """
+    out = []
+    stack = []
+    in_string = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            if char == '\\':
+                nxt = text[i + 1] if i + 1 < len(text) else ''
+                if nxt and nxt in VALID_ESCAPES:
+                    out.append(char + nxt)
+                    i += 2
+                    continue
+                out.append('\\\\')
+            elif char == '"':
+                if _closes_string(text, i):
+                    in_string = False
+                    out.append(char)
+                else:
+                    out.append('\\"')
+            elif char == '\n':
+                out.append('\\n')
+            elif char == '\r':
+                out.append('\\r')
+            elif char == '\t':
+                out.append('\\t')
+            elif ord(char) < 0x20:
+                out.append(f'\\u{ord(char):04x}')
+            else:
+                out.append(char)
+        else:
+            if char == '"':
+                in_string = True
+            elif char in '{[':
+                stack.append('}' if char == '{' else ']')
+            elif char in '}]':
+                # Drop a trailing comma before the closing bracket
+                while out and out[-1] in ' \t\r\n':
+                    out.pop()
+                if out and out[-1] == ',':
+                    out.pop()
+                if stack:
+                    stack.pop()
+            out.append(char)
+        i += 1
+
+    # Close whatever a truncated response left open
+    if in_string:
+        out.append('"')
+    while out and out[-1] in ' \t\r\n,:':
+        if out[-1] == ':':
+            out.append('null')
+            break
+        out.pop()
+    out.extend(reversed(stack))
+
+    return ''.join(out)
+
+
+def parse_json_object(text: str) -> Dict:
+    """
+    Parse a JSON object from an LLM response, repairing it if needed.
+
+    Args:
+        text: Raw response text
+
+    Returns:
+        Parsed object
+
+    Raises:
+        ValueError: If no JSON object can be recovered
+    """
+    text = strip_code_fences(text)
+    try:
+        data = json.loads(text)
+    except ValueError:
+        candidate = extract_json_object(text)
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            data = json.loads(repair_json(candidate))
+
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+    return data
+
+
+def parse_json_array(text: str) -> List:
+    """
+    Parse a JSON array from an LLM response, repairing it if needed.
+
+    A truncated array is closed after its last recoverable item.
+
+    Args:
+        text: Raw response text
+
+    Returns:
+        Parsed items
+
+    Raises:
+        ValueError: If no JSON array can be recovered
+    """
+    text = strip_code_fences(text)
+    try:
+        data = json.loads(text)
+    except ValueError:
+        candidate = extract_json_object(text, opening='[')
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            data = json.loads(repair_json(candidate))
+
+    if not isinstance(data, list):
+        raise ValueError(f"Expected a JSON array, got {type(data).__name__}")
+    return data
+
+
+class IncrementalJSONParser:
+    """
+    Parse the top-level fields of a JSON object while it is streamed in.
+
+    Text before the opening brace (a code fence or prose) is skipped. Each
+    field is surfaced as soon as its value is complete. Input the parser
+    cannot follow marks it invalid, after which the complete text should be
+    parsed with parse_json_object instead.
+    """
+
+    def __init__(self):
+        """Initialize the parser."""
+        self.fields: Dict[str, Any] = {}
+        self.state = 'start'
+        self.chars_seen = 0
+        self.current_key: Optional[str] = None
+        self._raw: List[str] = []
+        self._escaped = False
+        self._depth = 0
+        self._in_string = False
+
+    @property
+    def started(self) -> bool:
+        """Whether the opening brace has been seen."""
+        return self.state != 'start'
+
+    @property
+    def done(self) -> bool:
+        """Whether the closing brace has been seen."""
+        return self.state == 'done'
+
+    @property
+    def invalid(self) -> bool:
+        """Whether the input could not be followed."""
+        return self.state == 'invalid'
+
+    def partial(self, key: str) -> str:
+        """
+        Value of a field so far, complete or not.
+
+        Args:
+            key: Field name
+
+        Returns:
+            The completed value as text, the raw (still escaped) text of a
+            string value being streamed, or '' if the field has not started
+        """
+        if key in self.fields:
+            return str(self.fields[key])
+        if key == self.current_key and self.state in ('string', 'value'):
+            return ''.join(self._raw)
+        return ''
+
+    def _complete(self, value: Any) -> None:
+        self.fields[self.current_key] = value
+        self.current_key = None
+        self._raw = []
+        self.state = 'after_value'
+
+    def feed(self, chunk: str) -> None:
+        """
+        Consume the next chunk of the response.
+
+        Completed fields are added to self.fields.
+
+        Args:
+            chunk: Response text
+        """
+        for char in chunk:
+            if self.state in ('done', 'invalid'):
+                break
+            self.chars_seen += 1
+            self._step(char)
+
+    def _step(self, char: str) -> None:
+        state = self.state
+        if state == 'start':
+            if char == '{':
+                self.state = 'key_or_end'
+        elif state in ('key_or_end', 'key'):
+            if char == '"':
+                self.state = 'key_string'
+            elif char == '}' and state == 'key_or_end':
+                self.state = 'done'
+            elif not char.isspace():
+                self.state = 'invalid'
+        elif state == 'key_string':
+            if self._escaped:
+                self._escaped = False
+                self._raw.append(char)
+            elif char == '\\':
+                self._escaped = True
+                self._raw.append(char)
+            elif char == '"':
+                try:
+                    self.current_key = json.loads('"' + ''.join(self._raw) + '"', strict=False)
+                except ValueError:
+                    self.state = 'invalid'
+                    return
+                self._raw = []
+                self.state = 'colon'
+            else:
+                self._raw.append(char)
+        elif state == 'colon':
+            if char == ':':
+                self.state = 'value_start'
+            elif not char.isspace():
+                self.state = 'invalid'
+        elif state == 'value_start':
+            if char == '"':
+                self.state = 'string'
+            elif not char.isspace():
+                # Numbers, literals, arrays and objects are collected raw
+                self.state = 'value'
+                self._depth = 1 if char in '[{' else 0
+                self._in_string = False
+                self._raw = [char]
+        elif state == 'string':
+            if self._escaped:
+                self._escaped = False
+                self._raw.append(char)
+            elif char == '\\':
+                self._escaped = True
+                self._raw.append(char)
+            elif char == '"':
+                try:
+                    value = json.loads('"' + ''.join(self._raw) + '"', strict=False)
+                except ValueError:
+                    self.state = 'invalid'
+                    return
+                self._complete(value)
+            else:
+                self._raw.append(char)
+        elif state == 'value':
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '[{':
+                self._depth += 1
+            elif char in ']}' and self._depth > 0:
+                self._depth -= 1
+            elif char in ',}' and self._depth == 0:
+                try:
+                    value = json.loads(''.join(self._raw))
+                except ValueError:
+                    self.state = 'invalid'
+                    return
+                self._complete(value)
+                self.state = 'key' if char == ',' else 'done'
+                return
+            self._raw.append(char)
+        elif state == 'after_value':
+            if char == ',':
+                self.state = 'key_or_end'
+            elif char == '}':
+                self.state = 'done'
+            elif not char.isspace():
+                self.state = 'invalid'
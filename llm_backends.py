@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+LLM backends for the article generator.
+The generator talks to the LLM through an LLMBackend. CallLLMBackend uses the
+deployment's call_llm.py (Intuit Genos API); FakeLLMBackend answers locally with
+configurable latency, failures and response size for offline testing and benchmarks.
+
+Prompts start with static instructions shared by every call of a batch. Backends
+receive the length of that prefix as cacheable_prefix so providers with prompt
+caching can mark it cacheable.
+"""
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+
+class StreamAbortedError(ValueError):
+    """A streamed response was abandoned before it finished."""
+
+
+class LLMBackend:
+    """Base class of LLM backends."""
+
+    def generate(self, prompt: str, model_name: str, cacheable_prefix: int = 0) -> str:
+        """
+        Generate a response for a prompt.
+
+        Args:
+            prompt: Prompt text
+            model_name: LLM model name
+            cacheable_prefix: Characters at the start of the prompt that are
+                identical across calls and may be cached by the provider
+
+        Returns:
+            Raw response text
+        """
+        raise NotImplementedError
+
+    async def generate_async(self, prompt: str, model_name: str, cacheable_prefix: int = 0) -> str:
+        """
+        Generate a response without blocking the event loop.
+
+        The default runs generate() in the loop's executor.
+
+        Args:
+            prompt: Prompt text
+            model_name: LLM model name
+            cacheable_prefix: Characters of the prompt's cacheable prefix
+
+        Returns:
+            Raw response text
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.generate, prompt, model_name, cacheable_prefix=cacheable_prefix)
+        )
+
+    def stream(self, prompt: str, model_name: str, cacheable_prefix: int = 0) -> Iterator[str]:
+        """
+        Generate a response as a stream of text chunks.
+
+        The default yields the complete response as a single chunk.
+
+        Args:
+            prompt: Prompt text
+            model_name: LLM model name
+            cacheable_prefix: Characters of the prompt's cacheable prefix
+
+        Yields:
+            Response text chunks
+        """
+        yield self.generate(prompt, model_name, cacheable_prefix=cacheable_prefix)
+
+
+class CallLLMBackend(LLMBackend):
+    """
+    Backend using get_llm_output from the deployment's call_llm.py.
+
+    The cacheable prefix length is passed as a cacheable_prefix keyword to
+    the call_llm functions that accept one, e.g. to send the prefix as a
+    separate cached system block.
+    """
+
+    def __init__(self):
+        """Initialize the backend; call_llm is imported on first use."""
+        self._module = None
+        self._accepts_prefix: Dict[str, bool] = {}
+
+    @property
+    def module(self):
+        """The imported call_llm module."""
+        if self._module is None:
+            import call_llm
+            self._module = call_llm
+        return self._module
+
+    def _kwargs(self, function, model_name: str, cacheable_prefix: int) -> Dict:
+        kwargs = {'model_name': model_name}
+        if cacheable_prefix:
+            name = function.__name__
+            if name not in self._accepts_prefix:
+                try:
+                    parameters = inspect.signature(function).parameters
+                except (TypeError, ValueError):
+                    parameters = {}
+                self._accepts_prefix[name] = 'cacheable_prefix' in parameters
+            if self._accepts_prefix[name]:
+                kwargs['cacheable_prefix'] = cacheable_prefix
+        return kwargs
+
+    def generate(self, prompt: str, model_name: str, cacheable_prefix: int = 0) -> str:
+        """
+        Generate a response with call_llm.get_llm_output.
+
+        Args:
+            prompt: Prompt text
+            model_name: LLM model name
+            cacheable_prefix: Characters of the prompt's cacheable prefix
+
+        Returns:
+            Raw response text
+        """
+        get_llm_output = self.module.get_llm_output
+        return get_llm_output(prompt, **self._kwargs(get_llm_output, model_name, cacheable_prefix))
+
+    async def generate_async(self, prompt: str, model_name: str, cacheable_prefix: int = 0) -> str:
+        """
+        Generate a response with call_llm.get_llm_output_async if the
+        deployment provides it, or get_llm_output in the loop's executor.
+
+        Args:
+            prompt: Prompt text
+            model_name: LLM model name
+            cacheable_prefix: Characters of the prompt's cacheable prefix
+
+        Returns:
+            Raw response text
+        """
+        get_llm_output_async = getattr(self.module, 'get_llm_output_async', None)
+        if get_llm_output_async is not None:
+            return await get_llm_output_async(
+                prompt, **self._kwargs(get_llm_output_async, model_name, cacheable_prefix)
+            )
+        return await super().generate_async(prompt, model_name, cacheable_prefix=cacheable_prefix)
+
+    def stream(self, prompt: str, model_name: str, cacheable_prefix: int = 0) -> Iterator[str]:
+        """
+        Stream a response with call_llm.get_llm_output_stream if the
+        deployment provides it, or yield get_llm_output's response whole.
+
+        Args:
+            prompt: Prompt text
+            model_name: LLM model name
+            cacheable_prefix: Characters of the prompt's cacheable prefix
+
+        Yields:
+            Response text chunks
+        """
+        get_llm_output_stream = getattr(self.module, 'get_llm_output_stream', None)
+        if get_llm_output_stream is None:
+            yield self.generate(prompt, model_name, cacheable_prefix=cacheable_prefix)
+            return
+        yield from get_llm_output_stream(
+            prompt, **self._kwargs(get_llm_output_stream, model_name, cacheable_prefix)
+        )
+
+
+class FakeLLMBackend(LLMBackend):
+    """Local stand-in for the LLM API with configurable behavior."""
+
+    FIELD_PATTERN = re.compile(r'^\d+\. "(\w+)":', re.MULTILINE)
+    TOPIC_PATTERN = re.compile(r'about: "([^"]+)"')
+    GROUP_TOPIC_PATTERN = re.compile(r'^\d+\. "([^"]+)" \(Tags', re.MULTILINE)
+
+    OFF_TOPIC = "Medieval Castle Architecture"
+
+    # Share of the latency spent before the first streamed chunk
+    FIRST_CHUNK_SHARE = 0.2
+    STREAM_CHUNK_CHARS = 200
+
+    WORDS = (
+        'model', 'data', 'training', 'gradient', 'loss', 'feature', 'vector', 'layer',
+        'parameter', 'prediction', 'error', 'function', 'learning', 'the', 'a', 'of',
+        'and', 'with', 'to', 'is', 'we', 'this', 'each', 'value'
+    )
+
+    def __init__(
+        self,
+        latency: float = 1.0,
+        latency_sigma: float = 0.5,
+        failure_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        off_topic_rate: float = 0.0,
+        response_words: int = 2000,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the fake backend.
+
+        Args:
+            latency: Median response latency in seconds
+            latency_sigma: Spread of the log-normal latency distribution
+                (0 for a constant latency)
+            failure_rate: Fraction of calls failing with a generic error
+            throttle_rate: Fraction of calls failing with a 429 rate limit error
+            malformed_rate: Fraction of responses wrapped in a code fence and
+                trailing prose, exercising the JSON repair path
+            off_topic_rate: Fraction of responses about an unrelated topic
+            response_words: Words of article content per full-article response
+            seed: Random seed for reproducible runs
+        """
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.failure_rate = failure_rate
+        self.throttle_rate = throttle_rate
+        self.malformed_rate = malformed_rate
+        self.off_topic_rate = off_topic_rate
+        self.response_words = response_words
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        # Simulated provider prompt cache: prefixes seen per model
+        self._prefixes = set()
+        self.prefix_cache_hits = 0
+        self.cached_prompt_chars = 0
+
+    def _note_prefix(self, prompt: str, model_name: str, cacheable_prefix: int) -> None:
+        if not cacheable_prefix:
+            return
+        key = (model_name, hashlib.sha256(prompt[:cacheable_prefix].encode('utf-8')).digest())
+        with self._lock:
+            if key in self._prefixes:
+                self.prefix_cache_hits += 1
+                self.cached_prompt_chars += cacheable_prefix
+            else:
+                self._prefixes.add(key)
+
+    def _draw(self) -> Dict:
+        with self._lock:
+            self.calls += 1
+            draw = {
+                'latency': self._random.lognormvariate(math.log(self.latency), self.latency_sigma)
+                if self.latency > 0 else 0.0,
+                'outcome': self._random.random(),
+                'malformed': self._random.random() < self.malformed_rate,
+                'off_topic': self._random.random() < self.off_topic_rate,
+                'seed': self._random.random(),
+            }
+            if draw['outcome'] < self.failure_rate + self.throttle_rate:
+                self.failures += 1
+        return draw
+
+    def _raise_failure(self, outcome: float) -> None:
+        if outcome < self.throttle_rate:
+            raise RuntimeError("429 Too Many Requests: rate limit exceeded")
+        if outcome < self.throttle_rate + self.failure_rate:
+            raise RuntimeError("Simulated LLM backend failure")
+
+    def _text(self, rng: random.Random, words: int) -> str:
+        return ' '.join(rng.choices(self.WORDS, k=words))
+
+    def _content(self, rng: random.Random, words: int, sections: int, topic: str = '') -> str:
+        per_section = max(1, words // sections)
+        parts = [f"<p>{topic} explained.</p>"] if topic else []
+        for i in range(1, sections + 1):
+            parts.append(f"<h2>Section {i}</h2>\n<p>{self._text(rng, per_section)}</p>")
+        parts.append("<pre><code>loss = ((y - y_hat) ** 2).mean()</code></pre>")
+        return "\n".join(parts)
+
+    def respond(self, prompt: str, rng: Optional[random.Random] = None, off_topic: bool = False) -> str:
+        """
+        Build a well-formed response for any of the generator's prompts.
+
+        Args:
+            prompt: Prompt text
+            rng: Random source for the generated text
+            off_topic: Write about an unrelated topic instead
+
+        Returns:
+            Response text
+        """
+        rng = rng or random.Random(0)
+        match = self.TOPIC_PATTERN.search(prompt)
+        topic = self.OFF_TOPIC if off_topic else (match.group(1) if match else '')
+        if 'Return ONLY the HTML' in prompt:
+            return self._content(rng, max(1, self.response_words // 10), 1)
+
+        fields: List[str] = self.FIELD_PATTERN.findall(prompt)
+        if 'JSON array' in prompt:
+            return json.dumps([
+                self._article_object(fields, self.OFF_TOPIC if off_topic else group_topic, rng)
+                for group_topic in self.GROUP_TOPIC_PATTERN.findall(prompt)
+            ])
+        return json.dumps(self._article_object(fields, topic, rng))
+
+    def _article_object(self, fields: List[str], topic: str, rng: random.Random) -> Dict:
+        values = {
+            'topic': lambda: topic,
+            'title': lambda: f"Understanding {topic or self._text(rng, 5).title()}",
+            'content': lambda: self._content(rng, self.response_words, 10, topic),
+            'excerpt': lambda: self._text(rng, 20)[:150],
+            'summary': lambda: self._text(rng, 100),
+            'summary_title': lambda: self._text(rng, 3).title(),
+        }
+        return {field: values[field]() if field in values else '' for field in fields}
+
+    def _finish(self, prompt: str, draw: Dict) -> str:
+        self._raise_failure(draw['outcome'])
+        response = self.respond(prompt, random.Random(draw['seed']), off_topic=draw['off_topic'])
+        if draw['malformed']:
+            response = f"Here is the article:\n```json\n{response}\n```\nLet me know if you need changes."
+        return response
+
+    def generate(self, prompt: str, model_name: str, cacheable_prefix: int = 0) -> str:
+        """
+        Sleep for a sampled latency, then fail or respond.
+
+        Args:
+            prompt: Prompt text
+            model_name: LLM model name
+            cacheable_prefix: Characters of the prompt's cacheable prefix,
+                counted in prefix_cache_hits when seen before
+
+        Returns:
+            Response text
+        """
+        self._note_prefix(prompt, model_name, cacheable_prefix)
+        draw = self._draw()
+        time.sleep(draw['latency'])
+        return self._finish(prompt, draw)
+
+    async def generate_async(self, prompt: str, model_name: str, cacheable_prefix: int = 0) -> str:
+        """
+        Await a sampled latency, then fail or respond.
+
+        Args:
+            prompt: Prompt text
+            model_name: LLM model name
+            cacheable_prefix: Characters of the prompt's cacheable prefix
+
+        Returns:
+            Response text
+        """
+        self._note_prefix(prompt, model_name, cacheable_prefix)
+        draw = self._draw()
+        await asyncio.sleep(draw['latency'])
+        return self._finish(prompt, draw)
+
+    def stream(self, prompt: str, model_name: str, cacheable_prefix: int = 0) -> Iterator[str]:
+        """
+        Stream a response in chunks spread over the sampled latency.
+
+        Args:
+            prompt: Prompt text
+            model_name: LLM model name
+            cacheable_prefix: Characters of the prompt's cacheable prefix
+
+        Yields:
+            Response text chunks
+        """
+        self._note_prefix(prompt, model_name, cacheable_prefix)
+        draw = self._draw()
+        time.sleep(draw['latency'] * self.FIRST_CHUNK_SHARE)
+        response = self._finish(prompt, draw)
+        chunks = [
+            response[i:i + self.STREAM_CHUNK_CHARS]
+            for i in range(0, len(response), self.STREAM_CHUNK_CHARS)
+        ]
+        pause = draw['latency'] * (1 - self.FIRST_CHUNK_SHARE) / max(1, len(chunks))
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(pause)
+            yield chunk
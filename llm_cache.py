@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache for LLM responses.
+Entries are keyed by a hash of (model name, rendered prompt, prompt template version)
+and evicted least-recently-used first once the cache grows past its size limit.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+# Eviction frees space down to this fraction of max_bytes, so the cache
+# directory is walked once per several MB of new entries, not on every put
+EVICT_TO_FRACTION = 0.9
+
+
+class LLMCache:
+    """Persistent cache of raw LLM responses and the article parsed from them."""
+
+    def __init__(self, cache_dir: str = '.article_cache', max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_bytes: Total size the cache may grow to before evicting entries
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        self._evicting = False
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str, prompt_version: str) -> str:
+        """
+        Build the content address of a request.
+
+        Args:
+            model_name: LLM model name
+            prompt: Fully rendered prompt text
+            prompt_version: Version of the prompt template
+
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = json.dumps([model_name, prompt_version, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cache entry.
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Dictionary with 'response' and 'article', or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # Bump the modification time so eviction treats the entry as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        return entry
+
+    def put(self, key: str, response: str, article: Dict, **metadata) -> None:
+        """
+        Store a response and its parsed article, evicting old entries if needed.
+
+        Args:
+            key: Key from make_key
+            response: Raw LLM response text
+            article: Parsed article dictionary
+            **metadata: Extra fields stored with the entry (model name, etc.)
+        """
+        entry = dict(metadata)
+        entry.update({
+            'created_at': time.time(),
+            'response': response,
+            'article': article,
+        })
+        data = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temp file and rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            with self._lock:
+                previous = os.path.getsize(path) if os.path.exists(path) else 0
+                os.replace(tmp_path, path)
+                if self._total_bytes is not None:
+                    self._total_bytes += len(data) - previous
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self) -> int:
+        """
+        Remove least-recently-used entries once the cache outgrows max_bytes.
+
+        Entries are removed until the cache is down to EVICT_TO_FRACTION of
+        max_bytes. The directory is walked without holding the lock, and
+        only by one thread at a time, so other writers are not blocked.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            if self._total_bytes <= self.max_bytes or self._evicting:
+                return 0
+            self._evicting = True
+
+        try:
+            target = self.max_bytes * EVICT_TO_FRACTION
+            removed = 0
+            for _, size, path in sorted(self._entries()):
+                with self._lock:
+                    if self._total_bytes <= target:
+                        break
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        continue
+                    self._total_bytes -= size
+                    removed += 1
+            return removed
+        finally:
+            with self._lock:
+                self._evicting = False
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Prometheus metrics for long-running generation jobs.
+Counters, gauges and histograms rendered in the Prometheus text exposition format,
+served from a local HTTP endpoint or written periodically to a file for the
+node_exporter textfile collector.
+"""
+
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from instrumentation import TopicTrace
+from llm_backends import StreamAbortedError
+from rate_limiter import estimate_tokens, is_throttling_error
+
+
+# Buckets in seconds, sized for LLM calls that take seconds to minutes
+DURATION_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Base class of metrics with optional labels."""
+
+    type_name = 'untyped'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        function: Optional[Callable[[], float]] = None
+    ):
+        """
+        Initialize the metric.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Names of the labels every sample carries
+            function: Callback returning the current value, read at render
+                time (unlabelled metrics only)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.function = function
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _add(self, amount: float, labels: Dict[str, str]) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """
+        Current samples of the metric.
+
+        Returns:
+            (name suffix, labels, value) tuples
+        """
+        if self.function is not None:
+            return [('', {}, float(self.function()))]
+        with self._lock:
+            values = dict(self._values)
+        if not values and not self.labelnames:
+            # Export unlabelled metrics from the start, not after the first event
+            return [('', {}, 0.0)]
+        return [('', dict(zip(self.labelnames, key)), value) for key, value in sorted(values.items())]
+
+    def render(self) -> str:
+        """Metric in the text exposition format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        """
+        Increase the counter.
+
+        Args:
+            amount: Non-negative increment
+            **labels: Label values
+        """
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._add(amount, labels)
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    type_name = 'gauge'
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        """Increase the gauge."""
+        self._add(amount, labels)
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        """Decrease the gauge."""
+        self._add(-amount, labels)
+
+    def set(self, value: float, **labels) -> None:
+        """Set the gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(Metric):
+    """Distribution of observed values over cumulative buckets."""
+
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DURATION_BUCKETS
+    ):
+        """
+        Initialize the histogram.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Names of the labels every sample carries
+            buckets: Upper bounds of the buckets; +Inf is added
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._histograms: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value: Observed value
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            # Per-bucket counts, then the sum and the total count
+            counts = self._histograms.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            counts[-2] += value
+            counts[-1] += 1
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """Cumulative bucket, sum and count samples."""
+        with self._lock:
+            histograms = {key: list(counts) for key, counts in self._histograms.items()}
+
+        samples = []
+        for key, counts in sorted(histograms.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append(('_bucket', dict(labels, le=_format_value(bound)), cumulative))
+            samples.append(('_sum', labels, counts[-2]))
+            samples.append(('_count', labels, counts[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Add a metric to the registry.
+
+        Args:
+            metric: Metric to add
+
+        Returns:
+            The metric
+        """
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the text exposition format."""
+        return ''.join(metric.render() for metric in self.metrics)
+
+
+class GeneratorMetrics:
+    """Metrics of an article generation job."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        """
+        Initialize the job's metrics.
+
+        Args:
+            registry: Registry to add the metrics to (default: a new one)
+        """
+        self.registry = registry or MetricsRegistry()
+        add = self.registry.register
+        self.articles = add(Counter(
+            'article_generator_articles_total',
+            "Topics finished, by status (completed, failed, skipped, journaled, error)",
+            ['status']
+        ))
+        self.cache_hits = add(Counter(
+            'article_generator_cache_hits_total', "Articles served from the response cache"
+        ))
+        self.fallbacks = add(Counter(
+            'article_generator_fallbacks_total', "Articles replaced by placeholder content after failing"
+        ))
+        self.topic_duration = add(Histogram(
+            'article_generator_topic_duration_seconds', "Time to generate one topic"
+        ))
+        self.llm_requests = add(Counter(
+            'article_generator_llm_requests_total',
+            "LLM calls, by model role and outcome (success, error, throttled, aborted)",
+            ['role', 'outcome']
+        ))
+        self.llm_duration = add(Histogram(
+            'article_generator_llm_request_duration_seconds', "Duration of LLM calls", ['role']
+        ))
+        self.llm_in_flight = add(Gauge(
+            'article_generator_llm_requests_in_flight', "LLM calls currently in progress"
+        ))
+        self.llm_tokens = add(Counter(
+            'article_generator_llm_tokens_estimated_total',
+            "Estimated tokens sent to and received from the LLM",
+            ['direction']
+        ))
+        self.retries = add(Counter(
+            'article_generator_retries_total', "Retried attempts, by reason (throttled, error)", ['reason']
+        ))
+
+    def add_callback_metric(self, metric_class, name: str, documentation: str, function: Callable[[], float]) -> None:
+        """
+        Register a metric whose value is read from a callback at render time.
+
+        Args:
+            metric_class: Counter or Gauge
+            name: Metric name
+            documentation: Help text
+            function: Callback returning the current value
+        """
+        self.registry.register(metric_class(name, documentation, function=function))
+
+    def llm_call_started(self) -> None:
+        """Count an LLM call as in flight."""
+        self.llm_in_flight.inc()
+
+    def llm_call_finished(
+        self,
+        role: str,
+        seconds: float,
+        prompt: str,
+        response: str,
+        error: Optional[BaseException] = None
+    ) -> None:
+        """
+        Record a finished LLM call.
+
+        Args:
+            role: Model role of the call
+            seconds: Duration of the call
+            prompt: Prompt text
+            response: Response text (empty if the call failed)
+            error: Error the call failed with, if any
+        """
+        self.llm_in_flight.dec()
+        if error is None:
+            outcome = 'success'
+        elif isinstance(error, StreamAbortedError):
+            outcome = 'aborted'
+        else:
+            outcome = 'throttled' if is_throttling_error(error) else 'error'
+        self.llm_requests.inc(role=role, outcome=outcome)
+        self.llm_duration.observe(seconds, role=role)
+        self.llm_tokens.inc(estimate_tokens(prompt), direction='prompt')
+        if response:
+            self.llm_tokens.inc(estimate_tokens(response), direction='response')
+
+    def retry(self, error: BaseException) -> None:
+        """
+        Count a retried attempt.
+
+        Args:
+            error: Error of the failed attempt
+        """
+        self.retries.inc(reason='throttled' if is_throttling_error(error) else 'error')
+
+    def observe_topic(self, trace: TopicTrace) -> None:
+        """
+        Record a finished topic; a RunInstrumentation listener.
+
+        Args:
+            trace: Trace of the finished topic
+        """
+        self.articles.inc(status=trace.status)
+        if trace.status == 'failed':
+            self.fallbacks.inc()
+        if trace.cached:
+            self.cache_hits.inc()
+        self.topic_duration.observe(trace.elapsed)
+
+
+class MetricsHTTPServer:
+    """Serve a registry at /metrics from a background thread."""
+
+    def __init__(self, registry: MetricsRegistry, port: int, address: str = '127.0.0.1'):
+        """
+        Start the server.
+
+        Args:
+            registry: Metrics to serve
+            port: TCP port (0 picks a free port)
+            address: Address to bind (default: loopback only; '' or '0.0.0.0'
+                for all interfaces)
+        """
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Scrapes would otherwise be logged to stderr every few seconds
+                pass
+
+        self.server = ThreadingHTTPServer((address, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop serving."""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TextfileExporter:
+    """Rewrite a textfile-collector file periodically from a background thread."""
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float = 15.0):
+        """
+        Start the exporter.
+
+        Args:
+            registry: Metrics to export
+            path: Output file, e.g. /var/lib/node_exporter/articles.prom
+            interval: Seconds between rewrites
+        """
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self.write()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self) -> None:
+        """Write the current metrics atomically."""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.registry.render())
+        os.replace(tmp_path, self.path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def close(self) -> None:
+        """Stop the exporter after a final write."""
+        self._stop.set()
+        self._thread.join()
+        self.write()
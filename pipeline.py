@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Bounded producer/consumer pipeline for batch generation.
+Items flow through a chain of stages, each run by its own pool of threads and fed
+by a bounded queue, and come out in input order. A cap on the items in flight
+keeps memory flat when the consumer is slower than the stages.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """
+    Split an iterable into consecutive lists, consuming it lazily.
+
+    Args:
+        items: Items to split
+        size: Items per list (the last list may be shorter)
+
+    Yields:
+        Lists of up to size items
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, max(1, size)))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Stage:
+    """One step of a pipeline."""
+
+    def __init__(
+        self,
+        name: str,
+        function: Callable[[Any], Any],
+        workers: int = 1,
+        queue_size: Optional[int] = None
+    ):
+        """
+        Initialize the stage.
+
+        Args:
+            name: Stage name, used in the stats
+            function: Called with each item; its result is passed on to the
+                next stage
+            workers: Threads running the function
+            queue_size: Items waiting for the stage before the previous one
+                blocks (default: one per worker)
+        """
+        self.name = name
+        self.function = function
+        self.workers = max(1, workers)
+        self.queue_size = queue_size if queue_size and queue_size > 0 else self.workers
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.peak_queue = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, failed: bool, queued: int) -> None:
+        """
+        Count one processed item.
+
+        Args:
+            seconds: Time spent in the function
+            failed: Whether the function raised
+            queued: Items waiting in the stage's queue when it was taken
+        """
+        with self._lock:
+            self.items += 1
+            self.errors += failed
+            self.busy_seconds += seconds
+            self.peak_queue = max(self.peak_queue, queued)
+
+    def stats(self, wall: float) -> Dict:
+        """
+        Summary of the stage's work.
+
+        Args:
+            wall: Seconds the pipeline ran
+
+        Returns:
+            JSON-serializable stats; utilization is the share of the
+            workers' time spent busy
+        """
+        return {
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'items': self.items,
+            'errors': self.errors,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'utilization': round(self.busy_seconds / (self.workers * wall), 3) if wall > 0 else 0.0,
+            'peak_queue': self.peak_queue,
+        }
+
+
+class Pipeline:
+    """Chain of stages connected by bounded queues."""
+
+    def __init__(self, stages: List[Stage], max_in_flight: int):
+        """
+        Initialize the pipeline.
+
+        Args:
+            stages: Stages in processing order
+            max_in_flight: Items taken from the input but not yet consumed,
+                across all stages and the reordering buffer
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.max_in_flight = max(1, max_in_flight)
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def run(self, items: Iterable) -> Iterator:
+        """
+        Process items and yield the results in input order.
+
+        The input is consumed lazily, only as fast as results are consumed.
+        If a stage raises, the exception is raised here at that item's
+        position; later items are dropped and the threads stopped.
+
+        Args:
+            items: Input items, e.g. a generator
+
+        Yields:
+            Result of the last stage for each item
+        """
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        # Its producers are bounded by the in-flight cap, so the output queue
+        # never needs to block them
+        output = queue.Queue()
+        slots = threading.Semaphore(self.max_in_flight)
+        stop = threading.Event()
+        self.started = time.perf_counter()
+        self.finished = None
+
+        def feed() -> None:
+            seq = 0
+            try:
+                for item in items:
+                    while not slots.acquire(timeout=0.1):
+                        if stop.is_set():
+                            return
+                    if stop.is_set():
+                        return
+                    queues[0].put((seq, item, None))
+                    seq += 1
+            except Exception as e:
+                # A failing input is reported in its place in the order
+                output.put((seq, None, e))
+            finally:
+                for _ in range(self.stages[0].workers):
+                    queues[0].put(_DONE)
+
+        def work(index: int, stage: Stage, remaining: List[int], lock: threading.Lock) -> None:
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(queues) else output
+            while True:
+                entry = inbox.get()
+                if entry is _DONE:
+                    break
+                seq, item, error = entry
+                queued = inbox.qsize()
+                if error is None and not stop.is_set():
+                    start = time.perf_counter()
+                    try:
+                        item = stage.function(item)
+                    except Exception as e:
+                        error = e
+                    stage.record(time.perf_counter() - start, error is not None, queued)
+                outbox.put((seq, item, error))
+
+            # The last worker out tells the next stage there is no more input
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                if outbox is output:
+                    output.put(_DONE)
+                else:
+                    for _ in range(self.stages[index + 1].workers):
+                        outbox.put(_DONE)
+
+        threads = [threading.Thread(target=feed, name='pipeline-feed', daemon=True)]
+        for index, stage in enumerate(self.stages):
+            remaining, lock = [stage.workers], threading.Lock()
+            threads.extend(
+                threading.Thread(
+                    target=work, args=(index, stage, remaining, lock), name=f"pipeline-{stage.name}-{n}", daemon=True
+                )
+                for n in range(stage.workers)
+            )
+        for thread in threads:
+            thread.start()
+
+        buffered: Dict[int, tuple] = {}
+        next_seq = 0
+        try:
+            while True:
+                entry = output.get()
+                if entry is _DONE:
+                    break
+                buffered[entry[0]] = entry
+                while next_seq in buffered:
+                    _, item, error = buffered.pop(next_seq)
+                    next_seq += 1
+                    if error is not None:
+                        raise error
+                    yield item
+                    slots.release()
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            self.finished = time.perf_counter()
+
+    def stats(self) -> Dict:
+        """
+        Per-stage stats of the last run.
+
+        Returns:
+            Stats keyed by stage name
+        """
+        wall = ((self.finished or time.perf_counter()) - self.started) if self.started else 0.0
+        return {stage.name: stage.stats(wall) for stage in self.stages}
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Process-pool post-processing for the article generator.
+Counts the words of each article for its reading time and escapes and formats its
+output row in worker processes, so this CPU-bound work on long HTML bodies does
+not hold the GIL while the generator's threads wait on the LLM.
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+
+def finish_record(
+    record: Dict,
+    formatter: Optional[Callable[[Dict], str]],
+    reading_time: Callable[[str], int]
+) -> Tuple[Dict, Optional[str], float]:
+    """
+    Complete an article record and format its output row.
+
+    Runs in a worker process, so all arguments must be picklable.
+
+    Args:
+        record: Column values keyed by ARTICLE_COLUMNS; a reading_time of
+            None is computed from the content
+        formatter: Row formatter of the output, e.g. format_values_row, or
+            None for writers that take records unformatted
+        reading_time: Function computing the reading time of the content
+
+    Returns:
+        Tuple of the completed record, its formatted row (None without a
+        formatter) and the seconds spent
+    """
+    start = time.perf_counter()
+    if record['reading_time'] is None:
+        record = dict(record, reading_time=reading_time(record['content']))
+    row = formatter(record) if formatter is not None else None
+    return record, row, time.perf_counter() - start
+
+
+class PostProcessor:
+    """Pool of worker processes finishing article records."""
+
+    def __init__(
+        self,
+        workers: int,
+        formatter: Optional[Callable[[Dict], str]],
+        reading_time: Callable[[str], int]
+    ):
+        """
+        Start the worker processes.
+
+        Args:
+            workers: Number of worker processes
+            formatter: Row formatter of the output (see finish_record)
+            reading_time: Function computing the reading time of the content;
+                must be picklable, e.g. a functools.partial of a module-level
+                function
+        """
+        self.workers = workers
+        self.formatter = formatter
+        self.reading_time = reading_time
+        # Forking while generator threads hold locks can deadlock the
+        # children, so the workers are started fresh
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+        )
+
+    def submit(self, record: Dict) -> Future:
+        """
+        Finish a record in a worker process.
+
+        Args:
+            record: Column values keyed by ARTICLE_COLUMNS
+
+        Returns:
+            Future of finish_record's result
+        """
+        return self.executor.submit(finish_record, record, self.formatter, self.reading_time)
+
+    async def finish_async(self, record: Dict) -> Tuple[Dict, Optional[str], float]:
+        """
+        Finish a record in a worker process without blocking the event loop.
+
+        Args:
+            record: Column values keyed by ARTICLE_COLUMNS
+
+        Returns:
+            finish_record's result
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(finish_record, record, self.formatter, self.reading_time)
+        )
+
+    def close(self) -> None:
+        """Wait for pending records and stop the worker processes."""
+        self.executor.shutdown()
+
+    def __enter__(self) -> 'PostProcessor':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> Optional[bool]:
+        self.close()
+        return None
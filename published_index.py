@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Index of already-published articles for incremental runs.
+Collects the topic names and titles of articles found in earlier runs' journals and
+output files or in the articles table, so a growing topics file only pays for the
+topics that have no article yet.
+"""
+
+import csv
+import glob
+import itertools
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from db_loader import iter_article_titles
+from run_journal import RunJournal
+from sql_writer import ARTICLE_COLUMNS
+from topic_loader import OUTPUT_PREFIX, normalize_topic_name
+
+
+# Column list of an INSERT or COPY statement into the articles table
+_COLUMNS = re.compile(r'^(?:INSERT INTO|COPY)\s+articles\s*\(([^)]*)\)', re.IGNORECASE)
+
+JOURNAL_SUFFIX = '.journal.jsonl'
+
+
+def is_database_url(source: str) -> bool:
+    """Whether a source is a database URL rather than a file or directory."""
+    return source.startswith(('sqlite://', 'postgresql://', 'postgres://'))
+
+
+def output_files(directory: str = '.') -> List[str]:
+    """
+    Find the SQL files and journals of earlier runs in a directory.
+
+    Args:
+        directory: Directory the runs wrote to
+
+    Returns:
+        articles_insert_*.sql and articles_insert_*.journal.jsonl files, in
+        name order
+    """
+    patterns = (f"{OUTPUT_PREFIX}*.sql", f"{OUTPUT_PREFIX}*{JOURNAL_SUFFIX}")
+    return sorted(
+        path for pattern in patterns for path in glob.glob(os.path.join(directory, pattern))
+    )
+
+
+def _unescape_copy_text(value: str) -> str:
+    escapes = {'t': '\t', 'n': '\n', 'r': '\r', '\\': '\\'}
+    return re.sub(r'\\(.)', lambda match: escapes.get(match.group(1), match.group(1)), value)
+
+
+def _iter_insert_rows(lines: Iterable[str], columns: List[str]) -> Iterator[Dict[str, str]]:
+    """
+    Read the string columns of INSERT rows in format_values_row's layout.
+
+    Each field starts on its own line, so a field begins on every line that
+    starts outside a string literal. Quotes inside literals are doubled, so
+    an odd number of quotes on a line opens or closes a literal.
+    """
+    in_string = False
+    row: Optional[Dict[str, str]] = None
+    field = ''
+    index = 0
+    for line in lines:
+        if not in_string:
+            stripped = line.strip()
+            if row is None:
+                match = _COLUMNS.match(stripped)
+                if match:
+                    columns = [column.strip() for column in match.group(1).split(',')]
+                elif stripped == '(':
+                    row, index = {}, -1
+                continue
+            if stripped.startswith(')'):
+                yield row
+                row = None
+                continue
+            index += 1
+            field = ''
+        if row is not None:
+            field += line
+        in_string ^= line.count("'") % 2 == 1
+        if row is not None and not in_string and index < len(columns):
+            literal = field.strip().rstrip(',')
+            if literal.startswith("'") and literal.endswith("'"):
+                row[columns[index]] = literal[1:-1].replace("''", "'")
+
+
+def iter_output_rows(filepath: str) -> Iterator[Dict[str, str]]:
+    """
+    Read the articles of an output file of any of the generator's formats.
+
+    Args:
+        filepath: SQL file with INSERT statements, or a COPY text or CSV script
+
+    Yields:
+        String column values of each row keyed by column name
+    """
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        first = f.readline()
+        while first and not first.strip():
+            first = f.readline()
+        match = _COLUMNS.match(first.strip())
+        if not first.upper().startswith('COPY') or not match:
+            yield from _iter_insert_rows(itertools.chain([first], f), list(ARTICLE_COLUMNS))
+            return
+
+        columns = [column.strip() for column in match.group(1).split(',')]
+        if 'CSV' in first.upper():
+            for values in csv.reader(f):
+                if values == ['\\.']:
+                    return
+                yield dict(zip(columns, values))
+            return
+        for line in f:
+            line = line.rstrip('\r\n')
+            if line == '\\.':
+                return
+            yield {
+                column: _unescape_copy_text(value)
+                for column, value in zip(columns, line.split('\t'))
+            }
+
+
+class PublishedIndex:
+    """
+    Topic names and titles of the articles generated so far.
+
+    Journals name the topic of each article, so their topics match exactly.
+    Output files and databases only hold titles; each of those articles is
+    attributed to the longest topic of the batch whose normalized name
+    appears in its title as whole words, so "Mastering ROC AUC: Evaluating
+    Classifiers" counts as the "ROC AUC" article, and an article titled
+    "Stochastic Gradient Descent Explained" leaves a "Gradient Descent"
+    topic new when "Stochastic Gradient Descent" is in the batch too.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.names: Set[str] = set()
+        self.titles: List[str] = []
+        self.sources: List[str] = []
+        self.skipped = 0
+
+    def add_topic(self, name: str) -> None:
+        """
+        Mark a topic as published.
+
+        Args:
+            name: Topic name, as in a journal
+        """
+        self.names.add(normalize_topic_name(name))
+
+    def add_title(self, title: Optional[str]) -> None:
+        """
+        Index a published article known only by its title.
+
+        Args:
+            title: Article title
+        """
+        title = normalize_topic_name(title or '')
+        if title:
+            self.titles.append(title)
+
+    def load_journal(self, filepath: str) -> None:
+        """
+        Index the completed topics of a run journal.
+
+        Args:
+            filepath: Journal file
+        """
+        for topic in RunJournal(filepath).completed_articles():
+            self.add_topic(topic)
+
+    def load_output_file(self, filepath: str) -> None:
+        """
+        Index the rows of a SQL, COPY or CSV output file.
+
+        The journal of the run that wrote the file, if still next to it, is
+        indexed too for its exact topic names.
+
+        Args:
+            filepath: Output file
+        """
+        journal = os.path.splitext(filepath)[0] + JOURNAL_SUFFIX
+        if os.path.exists(journal):
+            self.load_journal(journal)
+        for row in iter_output_rows(filepath):
+            self.add_title(row.get('title'))
+
+    def load_database(self, db_url: str) -> None:
+        """
+        Index the articles table of a database.
+
+        Args:
+            db_url: 'sqlite:///path/to/file.db' or a 'postgresql://' connection URL
+        """
+        for title, _ in iter_article_titles(db_url):
+            self.add_title(title)
+
+    def load(self, source: str) -> None:
+        """
+        Index a database URL, journal, output file, or directory of earlier runs.
+
+        Args:
+            source: Where the published articles are
+
+        Raises:
+            ValueError: If the source does not exist
+        """
+        if is_database_url(source):
+            self.load_database(source)
+        elif os.path.isdir(source):
+            for filepath in output_files(source):
+                self.load(filepath)
+            return
+        elif not os.path.exists(source):
+            raise ValueError(f"Published articles source not found: {source}")
+        elif source.endswith(JOURNAL_SUFFIX):
+            self.load_journal(source)
+        else:
+            self.load_output_file(source)
+        self.sources.append(source)
+
+    def published_names(self, candidates: Set[str]) -> Set[str]:
+        """
+        Find which of the given topics already have an article.
+
+        Args:
+            candidates: Normalized topic names
+
+        Returns:
+            The candidates named in a journal or claimed by a title
+        """
+        published = candidates & self.names
+        longest = max((name.count(' ') + 1 for name in candidates), default=0)
+        for title in self.titles:
+            words = title.split(' ')
+            # Longest phrases first, so the most specific topic claims the title
+            for size in range(min(longest, len(words)), 0, -1):
+                match = next(
+                    (
+                        phrase for phrase in (' '.join(words[i:i + size]) for i in range(len(words) - size + 1))
+                        if phrase in candidates
+                    ),
+                    None
+                )
+                if match is not None:
+                    published.add(match)
+                    break
+        return published
+
+    def new_topics(self, topics: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Drop the topics that already have an article, counting them.
+
+        The topics are read twice: once for their names, to attribute titles
+        to the most specific topic, and once to yield the new ones.
+
+        Args:
+            topics: Re-iterable topic dictionaries, e.g. a list or TopicStream
+
+        Yields:
+            Topics without an article
+        """
+        self.skipped = 0
+        published = self.published_names({normalize_topic_name(topic['name']) for topic in topics})
+        for topic in topics:
+            if normalize_topic_name(topic['name']) in published:
+                self.skipped += 1
+                continue
+            yield topic
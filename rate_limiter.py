@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Adaptive rate limiting for LLM calls.
+Enforces requests-per-minute and tokens-per-minute budgets over a rolling window and
+adjusts the number of concurrent calls AIMD-style: additive increase on success,
+multiplicative decrease when the provider throttles.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional, Tuple
+
+
+# Rough size of one token in characters of English text
+CHARS_PER_TOKEN = 4
+
+# Phrases of rate limit errors; 429 only as a whole number, so offsets like
+# "char 4291" don't count
+THROTTLING_MESSAGE = re.compile(r'\b429\b|throttl|rate[ -]limit|too many requests|quota')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text: Prompt or response text
+
+    Returns:
+        Approximate token count
+    """
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """
+    Check whether an exception means the provider is throttling requests.
+
+    Errors raised while parsing or validating a response (ValueError and
+    its subclasses, e.g. JSON decode errors or abandoned streams) never
+    count, whatever their message quotes.
+
+    Args:
+        error: Exception raised by the LLM call
+
+    Returns:
+        True for rate limit / quota errors
+    """
+    status = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    if status == 429:
+        return True
+    if isinstance(error, ValueError):
+        return False
+
+    return THROTTLING_MESSAGE.search(str(error).lower()) is not None
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveRateLimiter:
+    """Shared limiter for LLM calls made from many threads or tasks."""
+
+    WINDOW_SECONDS = 60.0
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        backoff_factor: float = 0.5,
+        cooldown_seconds: float = 5.0
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request budget per rolling minute (default: unlimited)
+            tokens_per_minute: Token budget per rolling minute (default: unlimited)
+            max_concurrency: Upper bound of concurrent calls
+            min_concurrency: Lower bound the concurrency backs off to
+            backoff_factor: Factor the concurrency is multiplied by on throttling
+            cooldown_seconds: Pause before new calls start after a throttling error
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.backoff_factor = backoff_factor
+        self.cooldown_seconds = cooldown_seconds
+
+        self.concurrency = float(self.max_concurrency)
+        self.in_flight = 0
+        self.throttled = 0
+
+        self._requests = deque()
+        self._tokens = deque()
+        self._token_total = 0
+        self._cooldown_until = 0.0
+        self._condition = threading.Condition()
+        self._async_waiters = []
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Current number of calls allowed in flight."""
+        return max(self.min_concurrency, int(self.concurrency))
+
+    def _prune(self, now: float) -> None:
+        while self._requests and self._requests[0] <= now - self.WINDOW_SECONDS:
+            self._requests.popleft()
+        while self._tokens and self._tokens[0][0] <= now - self.WINDOW_SECONDS:
+            self._token_total -= self._tokens.popleft()[1]
+
+    def try_acquire(self, tokens: int = 0) -> float:
+        """
+        Claim a slot for one call if the budgets allow it.
+
+        Args:
+            tokens: Estimated tokens the call will consume
+
+        Returns:
+            0 if the slot was claimed, otherwise seconds to wait before retrying
+        """
+        return self._claim(tokens)[0]
+
+    def _claim(self, tokens: int) -> Tuple[float, Optional[list]]:
+        """Claim a slot, returning the wait and the call's [time, tokens] budget entry."""
+        with self._condition:
+            now = time.monotonic()
+            if now < self._cooldown_until:
+                return self._cooldown_until - now, None
+
+            if self.in_flight >= self.concurrency_limit:
+                # Waiters are woken early by release()
+                return 1.0, None
+
+            self._prune(now)
+            if self.requests_per_minute and len(self._requests) >= self.requests_per_minute:
+                return self._requests[0] + self.WINDOW_SECONDS - now, None
+            # A single call larger than the whole budget is let through once the window is empty
+            if (self.tokens_per_minute and self._tokens
+                    and self._token_total + tokens > self.tokens_per_minute):
+                return self._tokens[0][0] + self.WINDOW_SECONDS - now, None
+
+            self._requests.append(now)
+            entry = None
+            if tokens:
+                # A list, so release() can correct it to the call's actual usage
+                entry = [now, tokens]
+                self._tokens.append(entry)
+                self._token_total += tokens
+            self.in_flight += 1
+            return 0.0, entry
+
+    def acquire(self, tokens: int = 0) -> Optional[list]:
+        """
+        Block until a slot for one call is claimed.
+
+        Args:
+            tokens: Estimated tokens the call will consume
+
+        Returns:
+            Budget entry of the reserved tokens, to pass to release()
+        """
+        # Checking and waiting under one hold of the lock, so a release()
+        # in between cannot be missed
+        with self._condition:
+            while True:
+                wait, entry = self._claim(tokens)
+                if wait <= 0:
+                    return entry
+                self._condition.wait(timeout=wait)
+
+    async def acquire_async(self, tokens: int = 0) -> Optional[list]:
+        """
+        Wait without blocking the event loop until a slot is claimed.
+
+        Args:
+            tokens: Estimated tokens the call will consume
+
+        Returns:
+            Budget entry of the reserved tokens, to pass to release()
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            woken = loop.create_future()
+            # Registered in the same hold of the lock as the check, so a
+            # release() in between wakes this waiter
+            with self._condition:
+                wait, entry = self._claim(tokens)
+                if wait <= 0:
+                    return entry
+                self._async_waiters.append((loop, woken))
+            await asyncio.wait([woken], timeout=wait)
+
+    def release(
+        self,
+        throttled: bool = False,
+        reservation: Optional[list] = None,
+        tokens_used: Optional[int] = None
+    ) -> None:
+        """
+        Release a slot and adapt the concurrency to the call's outcome.
+
+        Args:
+            throttled: Whether the call failed with a throttling error
+            reservation: Budget entry returned by acquire()
+            tokens_used: Tokens the call actually consumed; the difference to
+                the reservation is given back to (or taken from) the budget
+        """
+        with self._condition:
+            if reservation is not None and tokens_used is not None:
+                now = time.monotonic()
+                self._prune(now)
+                # An entry already out of the window no longer counts
+                if reservation[0] > now - self.WINDOW_SECONDS:
+                    self._token_total += tokens_used - reservation[1]
+                    reservation[1] = tokens_used
+            self.in_flight = max(0, self.in_flight - 1)
+            if throttled:
+                self.throttled += 1
+                self.concurrency = max(float(self.min_concurrency), self.concurrency * self.backoff_factor)
+                self._cooldown_until = time.monotonic() + self.cooldown_seconds
+            else:
+                # Additive increase: roughly +1 after a full window of successes
+                self.concurrency = min(float(self.max_concurrency), self.concurrency + 1.0 / self.concurrency)
+            self._condition.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+
+        for loop, woken in waiters:
+            loop.call_soon_threadsafe(_wake, woken)
+
+    @contextmanager
+    def limit(self, tokens: int = 0):
+        """
+        Run one call under the limiter.
+
+        The block may store the tokens the call actually consumed in the
+        yielded dictionary's 'tokens_used' entry; otherwise the estimate
+        stays charged to the budget.
+
+        Args:
+            tokens: Estimated tokens the call will consume
+        """
+        reservation = self.acquire(tokens)
+        usage = {'tokens_used': None}
+        throttled = False
+        try:
+            yield usage
+        except BaseException as e:
+            throttled = is_throttling_error(e)
+            raise
+        finally:
+            self.release(throttled=throttled, reservation=reservation, tokens_used=usage['tokens_used'])
+
+    @asynccontextmanager
+    async def limit_async(self, tokens: int = 0):
+        """
+        Run one call under the limiter from asyncio code.
+
+        Usage is reported as with limit().
+
+        Args:
+            tokens: Estimated tokens the call will consume
+        """
+        reservation = await self.acquire_async(tokens)
+        usage = {'tokens_used': None}
+        throttled = False
+        try:
+            yield usage
+        except BaseException as e:
+            throttled = is_throttling_error(e)
+            raise
+        finally:
+            self.release(throttled=throttled, reservation=reservation, tokens_used=usage['tokens_used'])
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Retry policy for article generation.
+Failed LLM calls and unparseable responses are retried with exponential backoff and
+jitter, with the number of attempts configurable per error class.
+"""
+
+import asyncio
+import json
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Type
+
+from rate_limiter import is_throttling_error
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter and per-error-class attempt limits."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+        jitter: float = 0.5,
+        throttling_attempts: Optional[int] = None,
+        rules: Optional[Dict[Type[BaseException], int]] = None
+    ):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_attempts: Attempts for errors without a more specific rule
+            base_delay: Delay before the first retry in seconds, doubled per attempt
+            max_delay: Upper bound of a single delay in seconds
+            jitter: Fraction of each delay that is randomized (0 disables jitter)
+            throttling_attempts: Attempts for rate limit errors (default: twice max_attempts)
+            rules: Attempts per exception class, matched with isinstance in
+                insertion order, e.g. {json.JSONDecodeError: 2}
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.throttling_attempts = throttling_attempts if throttling_attempts is not None else self.max_attempts * 2
+        self.rules = rules if rules is not None else {json.JSONDecodeError: self.max_attempts}
+
+    @classmethod
+    def no_retry(cls) -> 'RetryPolicy':
+        """Policy that makes a single attempt."""
+        return cls(max_attempts=1, throttling_attempts=1, rules={})
+
+    def attempts_for(self, error: BaseException) -> int:
+        """
+        Number of attempts allowed for an error.
+
+        Args:
+            error: Exception raised by the last attempt
+
+        Returns:
+            Total attempts allowed, including the first one
+        """
+        if is_throttling_error(error):
+            return self.throttling_attempts
+        for error_class, attempts in self.rules.items():
+            if isinstance(error, error_class):
+                return attempts
+        return self.max_attempts
+
+    def delay_for(self, attempt: int) -> float:
+        """
+        Delay before the next attempt.
+
+        Args:
+            attempt: Number of the attempt that just failed (1-based)
+
+        Returns:
+            Delay in seconds
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (1 - self.jitter + random.random() * self.jitter)
+
+    def _next_delay(self, attempt: int, error: BaseException, on_retry) -> Optional[float]:
+        if attempt >= self.attempts_for(error):
+            return None
+        delay = self.delay_for(attempt)
+        if on_retry is not None:
+            on_retry(attempt, error, delay)
+        return delay
+
+    def call(
+        self,
+        func: Callable[[], Any],
+        on_retry: Optional[Callable[[int, BaseException, float], None]] = None
+    ) -> Any:
+        """
+        Call a function, retrying failures according to the policy.
+
+        Args:
+            func: Function making one attempt
+            on_retry: Called with (attempt, error, delay) before each retry
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            Exception: The error of the last attempt once retries are exhausted
+        """
+        attempt = 1
+        while True:
+            try:
+                return func()
+            except Exception as e:
+                delay = self._next_delay(attempt, e, on_retry)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    async def call_async(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        on_retry: Optional[Callable[[int, BaseException, float], None]] = None
+    ) -> Any:
+        """
+        Await a coroutine function, retrying failures according to the policy.
+
+        Args:
+            func: Coroutine function making one attempt
+            on_retry: Called with (attempt, error, delay) before each retry
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            Exception: The error of the last attempt once retries are exhausted
+        """
+        attempt = 1
+        while True:
+            try:
+                return await func()
+            except Exception as e:
+                delay = self._next_delay(attempt, e, on_retry)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Append-only run journal for batch article generation.
+Every processed topic is recorded as one JSON line next to the SQL output, so an
+interrupted run can be resumed without regenerating the topics it already finished.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+
+class RunJournal:
+    """JSONL journal of topic results for one generation run."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the journal.
+
+        Args:
+            path: Path of the JSONL journal file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path_for_run(run_id: str, directory: str = '.') -> str:
+        """
+        Build the journal path of a run.
+
+        Args:
+            run_id: Run identifier (the timestamp of the output file)
+            directory: Directory holding the run's output
+
+        Returns:
+            Journal file path
+        """
+        return os.path.join(directory, f"articles_insert_{run_id}.journal.jsonl")
+
+    def exists(self) -> bool:
+        """Whether the journal file has been created."""
+        return os.path.exists(self.path)
+
+    def _append(self, entry: Dict) -> None:
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+                f.flush()
+
+    def record_start(self, **details) -> None:
+        """
+        Record the start (or resumption) of a run.
+
+        Args:
+            **details: Run settings worth keeping, e.g. the input file
+        """
+        entry = {'event': 'start', 'timestamp': datetime.now().isoformat()}
+        entry.update(details)
+        self._append(entry)
+
+    def record_topic(
+        self,
+        topic: str,
+        status: str,
+        article: Optional[Dict] = None,
+        elapsed: Optional[float] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """
+        Record the outcome of one topic.
+
+        Args:
+            topic: Topic name
+            status: 'completed' or 'failed'
+            article: Generated article payload
+            elapsed: Generation time in seconds
+            error: Error message for failed topics
+        """
+        entry = {
+            'event': 'topic',
+            'timestamp': datetime.now().isoformat(),
+            'topic': topic,
+            'status': status,
+            'elapsed': round(elapsed, 3) if elapsed is not None else None,
+            'article': article,
+        }
+        if error:
+            entry['error'] = error
+        self._append(entry)
+
+    def record_loaded(self, topics: List[str]) -> None:
+        """
+        Record that the rows of topics were committed to a database.
+
+        Args:
+            topics: Topic names of the committed rows
+        """
+        self._append({'event': 'loaded', 'timestamp': datetime.now().isoformat(), 'topics': topics})
+
+    def load(self) -> Dict:
+        """
+        Read the journal back.
+
+        Lines that cannot be parsed (e.g. a partial line written during a
+        crash) are skipped. Later entries for a topic replace earlier ones.
+
+        Returns:
+            Dictionary with the first 'start' entry under 'start', the
+            latest entry per topic name under 'topics' and the names of the
+            topics whose rows were committed to a database under 'loaded'
+        """
+        state = {'start': None, 'topics': {}, 'loaded': set()}
+        if not self.exists():
+            return state
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('event') == 'start' and state['start'] is None:
+                    state['start'] = entry
+                elif entry.get('event') == 'topic':
+                    state['topics'][entry['topic']] = entry
+                elif entry.get('event') == 'loaded':
+                    state['loaded'].update(entry.get('topics', []))
+
+        return state
+
+    def completed_articles(self) -> Dict[str, Dict]:
+        """
+        Collect the articles of topics that completed successfully.
+
+        Returns:
+            Mapping of topic name to article payload
+        """
+        return {
+            topic: entry['article']
+            for topic, entry in self.load()['topics'].items()
+            if entry.get('status') == 'completed' and entry.get('article')
+        }
+
+    def loaded_topics(self) -> Set[str]:
+        """
+        Collect the topics whose rows were committed to a database.
+
+        Returns:
+            Topic names
+        """
+        return self.load()['loaded']
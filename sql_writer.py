@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Streaming SQL output for the article generator.
+Rows are written to the output file as soon as they are ready instead of being
+collected into one string at the end of a batch, either as INSERT statements or
+as PostgreSQL COPY data.
+"""
+
+import csv
+import io
+from typing import IO, Callable, Dict, List, Optional
+
+from instrumentation import stage
+
+
+ARTICLE_COLUMNS = (
+    'title', 'content', 'excerpt', 'summary', 'summary_title', 'featured_image',
+    'reading_time', 'tags', 'is_premium', 'views', 'created_by'
+)
+
+SQL_HEADER = f"""INSERT INTO articles ({', '.join(ARTICLE_COLUMNS)})
+VALUES
+"""
+
+OUTPUT_FORMATS = ('sql', 'copy', 'csv')
+
+
+def escape_sql_string(text: str) -> str:
+    """
+    Escape single quotes in SQL strings.
+
+    Args:
+        text: Text to escape
+
+    Returns:
+        Escaped text
+    """
+    return text.replace("'", "''")
+
+
+def format_values_row(record: Dict) -> str:
+    """
+    Format an article record as one row of an INSERT ... VALUES list.
+
+    Args:
+        record: Column values keyed by ARTICLE_COLUMNS
+
+    Returns:
+        SQL VALUES row
+    """
+    text = {
+        column: escape_sql_string(record[column] or '')
+        for column in ('title', 'content', 'excerpt', 'summary', 'summary_title', 'featured_image', 'created_by')
+    }
+
+    # Format tags as PostgreSQL array
+    tags_str = ", ".join([f"'{escape_sql_string(tag)}'" for tag in record['tags']])
+
+    return f"""  (
+    '{text['title']}',
+    '{text['content']}',
+    '{text['excerpt']}',
+    '{text['summary']}',
+    '{text['summary_title']}',
+    '{text['featured_image']}',
+    {record['reading_time']},
+    ARRAY[{tags_str}],
+    {str(record['is_premium']).lower()},
+    {record['views']},
+    '{text['created_by']}'
+  )"""
+
+
+def format_array_literal(values: List[str]) -> str:
+    """
+    Format strings as a PostgreSQL array literal, e.g. {"NLP","Deep Learning"}.
+
+    Args:
+        values: Array elements
+
+    Returns:
+        Array literal text
+    """
+    elements = []
+    for value in values:
+        value = value.replace('\\', '\\\\').replace('"', '\\"')
+        elements.append(f'"{value}"')
+    return '{' + ','.join(elements) + '}'
+
+
+def _copy_values(record: Dict) -> List[Optional[str]]:
+    values = []
+    for column in ARTICLE_COLUMNS:
+        value = record[column]
+        if value is None:
+            values.append(None)
+        elif column == 'tags':
+            values.append(format_array_literal(value))
+        elif isinstance(value, bool):
+            values.append('true' if value else 'false')
+        else:
+            values.append(str(value))
+    return values
+
+
+def escape_copy_text(value: Optional[str]) -> str:
+    """
+    Escape a value for the PostgreSQL COPY text format.
+
+    Args:
+        value: Column value, or None for NULL
+
+    Returns:
+        Escaped field
+    """
+    if value is None:
+        return '\\N'
+    return (
+        value.replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def format_copy_line(record: Dict) -> str:
+    """
+    Format an article record as one line of COPY text data.
+
+    Args:
+        record: Column values keyed by ARTICLE_COLUMNS
+
+    Returns:
+        Tab-separated line including the trailing newline
+    """
+    return '\t'.join(escape_copy_text(value) for value in _copy_values(record)) + '\n'
+
+
+def format_csv_line(record: Dict) -> str:
+    """
+    Format an article record as one line of COPY CSV data.
+
+    Args:
+        record: Column values keyed by ARTICLE_COLUMNS
+
+    Returns:
+        CSV line including the trailing newline
+    """
+    buffer = io.StringIO()
+    # Empty unquoted fields are NULL in COPY CSV, so quote every field to keep
+    # empty strings as empty strings
+    values = ['' if value is None else value for value in _copy_values(record)]
+    csv.writer(buffer, quoting=csv.QUOTE_ALL, lineterminator='\n').writerow(values)
+    return buffer.getvalue()
+
+
+class RecordWriter:
+    """Base class of destinations that article records are streamed to."""
+
+    rows_written = 0
+    # UTF-8 bytes of the rows written, excluding statement framing
+    bytes_written = 0
+    # Module-level function formatting a record as a row of the output, so
+    # rows can be formatted in other processes; None if records are written as is
+    formatter: Optional[Callable[[Dict], str]] = None
+    # Whether rows of earlier runs stay in the destination (e.g. committed to a
+    # database) instead of being rewritten, so a resumed run must skip them
+    keeps_rows = False
+
+    def write_record(self, record: Dict) -> None:
+        """
+        Write one article record.
+
+        Args:
+            record: Column values keyed by ARTICLE_COLUMNS
+        """
+        raise NotImplementedError
+
+    def write_formatted(self, record: Dict, row: Optional[str]) -> None:
+        """
+        Write one article record already formatted by the writer's formatter.
+
+        Args:
+            record: Column values keyed by ARTICLE_COLUMNS
+            row: formatter(record), or None if the writer has no formatter
+        """
+        self.write_record(record)
+
+    def close(self) -> None:
+        """Finish the output and release its resources."""
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> Optional[bool]:
+        self.close()
+        return None
+
+
+class SQLStreamWriter(RecordWriter):
+    """Append VALUES rows to INSERT statements as they are produced."""
+
+    formatter = staticmethod(format_values_row)
+
+    def __init__(
+        self,
+        output: IO[str],
+        close_output: bool = False,
+        rows_per_statement: Optional[int] = None,
+        transaction_per_statement: bool = False
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            output: Text stream the SQL is written to
+            close_output: Close the stream when the writer is closed
+            rows_per_statement: Start a new INSERT statement after this many
+                rows (default: one statement for all rows)
+            transaction_per_statement: Wrap each INSERT statement in its own
+                BEGIN/COMMIT so a bad row only rolls back its own chunk
+        """
+        self.output = output
+        self.close_output = close_output
+        self.rows_per_statement = rows_per_statement if rows_per_statement and rows_per_statement > 0 else None
+        self.transaction_per_statement = transaction_per_statement
+        self.rows_written = 0
+        self.bytes_written = 0
+        self.statements_written = 0
+        self.statement_rows = 0
+        self.closed = False
+
+    @classmethod
+    def open(cls, filepath: str, **options) -> 'SQLStreamWriter':
+        """
+        Create a writer for a new output file.
+
+        Args:
+            filepath: Path of the SQL file to create
+            **options: Writer options, e.g. rows_per_statement
+
+        Returns:
+            Writer owning the opened file
+        """
+        return cls(open(filepath, 'w'), close_output=True, **options)
+
+    def write_record(self, record: Dict) -> None:
+        """
+        Append one article record as a VALUES row.
+
+        Args:
+            record: Column values keyed by ARTICLE_COLUMNS
+        """
+        with stage('escape'):
+            row_sql = format_values_row(record)
+        self.write_formatted(record, row_sql)
+
+    def write_formatted(self, record: Dict, row: Optional[str]) -> None:
+        """
+        Append one VALUES row formatted with format_values_row.
+
+        Args:
+            record: Column values keyed by ARTICLE_COLUMNS
+            row: Formatted row
+        """
+        with stage('sql'):
+            self.write_row(row)
+
+    def write_row(self, row_sql: str) -> None:
+        """
+        Append one VALUES row and flush it to the output.
+
+        Args:
+            row_sql: Formatted row, e.g. from format_values_row
+        """
+        if self.statement_rows == 0:
+            self._begin_statement()
+        else:
+            self.output.write(",\n")
+
+        self.output.write(row_sql)
+        self.rows_written += 1
+        self.bytes_written += len(row_sql.encode('utf-8'))
+        self.statement_rows += 1
+
+        if self.rows_per_statement and self.statement_rows >= self.rows_per_statement:
+            self._end_statement()
+
+        self.output.flush()
+
+    def _begin_statement(self) -> None:
+        if self.statements_written:
+            self.output.write("\n\n")
+        if self.transaction_per_statement:
+            self.output.write("BEGIN;\n")
+        self.output.write(SQL_HEADER)
+
+    def _end_statement(self) -> None:
+        self.output.write(";")
+        if self.transaction_per_statement:
+            self.output.write("\nCOMMIT;")
+        self.statements_written += 1
+        self.statement_rows = 0
+
+    def close(self) -> None:
+        """Terminate the statement and release the output."""
+        if self.closed:
+            return
+        self.closed = True
+
+        if self.statement_rows:
+            self._end_statement()
+        self.output.flush()
+
+        if self.close_output:
+            self.output.close()
+
+
+class CopyStreamWriter(RecordWriter):
+    """Write article records as a psql COPY ... FROM STDIN script."""
+
+    def __init__(self, output: IO[str], close_output: bool = False, csv_format: bool = False):
+        """
+        Initialize the writer.
+
+        Args:
+            output: Text stream the COPY script is written to
+            close_output: Close the stream when the writer is closed
+            csv_format: Write CSV data instead of the default COPY text format
+        """
+        self.output = output
+        self.close_output = close_output
+        self.csv_format = csv_format
+        self.formatter = format_csv_line if csv_format else format_copy_line
+        self.rows_written = 0
+        self.bytes_written = 0
+        self.closed = False
+
+    @classmethod
+    def open(cls, filepath: str, **options) -> 'CopyStreamWriter':
+        """
+        Create a writer for a new output file.
+
+        Args:
+            filepath: Path of the script to create
+            **options: Writer options, e.g. csv_format
+
+        Returns:
+            Writer owning the opened file
+        """
+        return cls(open(filepath, 'w', newline=''), close_output=True, **options)
+
+    def write_record(self, record: Dict) -> None:
+        """
+        Append one article record as a line of COPY data and flush it.
+
+        Args:
+            record: Column values keyed by ARTICLE_COLUMNS
+        """
+        with stage('escape'):
+            line = self.formatter(record)
+        self.write_formatted(record, line)
+
+    def write_formatted(self, record: Dict, row: Optional[str]) -> None:
+        """
+        Append one line formatted with the writer's formatter and flush it.
+
+        Args:
+            record: Column values keyed by ARTICLE_COLUMNS
+            row: Formatted line
+        """
+        if self.rows_written == 0:
+            options = " WITH (FORMAT csv)" if self.csv_format else ""
+            self.output.write(f"COPY articles ({', '.join(ARTICLE_COLUMNS)}) FROM STDIN{options};\n")
+
+        with stage('sql'):
+            self.output.write(row)
+            self.output.flush()
+        self.rows_written += 1
+        self.bytes_written += len(row.encode('utf-8'))
+
+    def close(self) -> None:
+        """Terminate the COPY data and release the output."""
+        if self.closed:
+            return
+        self.closed = True
+
+        if self.rows_written:
+            self.output.write("\\.\n")
+        self.output.flush()
+
+        if self.close_output:
+            self.output.close()
+
+
+def open_writer(filepath: str, output_format: str = 'sql', **options) -> RecordWriter:
+    """
+    Create a streaming writer for an output file.
+
+    Args:
+        filepath: Path of the file to create
+        output_format: 'sql' for INSERT statements, 'copy' for COPY text
+            data or 'csv' for COPY CSV data
+        **options: Options of SQLStreamWriter (ignored for COPY output)
+
+    Returns:
+        Writer owning the opened file
+    """
+    if output_format == 'sql':
+        return SQLStreamWriter.open(filepath, **options)
+    if output_format in ('copy', 'csv'):
+        return CopyStreamWriter.open(filepath, csv_format=output_format == 'csv')
+    raise ValueError(f"Unknown output format: {output_format}")
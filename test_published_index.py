@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the published article index.
+Output files of every format are written with the generator's own writers and read
+back, and topics are matched against journals and title-only sources.
+"""
+
+import pytest
+
+from published_index import PublishedIndex, _iter_insert_rows, iter_output_rows
+from run_journal import RunJournal
+from sql_writer import ARTICLE_COLUMNS, open_writer
+
+
+def make_record(title: str, summary_title: str = 'Concept') -> dict:
+    return {
+        'title': title,
+        'content': "<p>line one\n  (\n  'odd quote''' \t tab \\ back\n)</p>",
+        'excerpt': "It's short",
+        'summary': 's',
+        'summary_title': summary_title,
+        'featured_image': 'https://example.com/image.png',
+        'reading_time': 3,
+        'tags': ['ML', "O'Reilly"],
+        'is_premium': False,
+        'views': 10,
+        'created_by': 'c41b5bc1-d819-4b8a-ab04-cf1ae4692304',
+    }
+
+
+RECORDS = [
+    make_record("Mastering ROC AUC: Evaluating a Classifier's Ranking", 'ROC AUC'),
+    make_record('Agent–environment interaction and Markov Decision Processes (MDPs)'),
+    make_record('A "quoted"\nmulti-line title', "It's"),
+]
+
+
+def write_output(path, output_format: str, **options) -> None:
+    writer = open_writer(str(path), output_format, **options)
+    with writer:
+        for record in RECORDS:
+            writer.write_record(record)
+
+
+@pytest.mark.parametrize('output_format, options', [
+    ('sql', {}),
+    ('sql', {'rows_per_statement': 2, 'transaction_per_statement': True}),
+    ('copy', {}),
+    ('csv', {}),
+])
+def test_output_rows_round_trip(tmp_path, output_format, options):
+    path = tmp_path / 'articles_insert_1.sql'
+    write_output(path, output_format, **options)
+
+    rows = list(iter_output_rows(str(path)))
+
+    assert [row['title'] for row in rows] == [record['title'] for record in RECORDS]
+    assert [row['summary_title'] for row in rows] == [record['summary_title'] for record in RECORDS]
+    assert rows[0]['content'] == RECORDS[0]['content']
+
+
+def test_insert_rows_skip_non_string_fields():
+    lines = [
+        "INSERT INTO articles (title, reading_time, tags)\n",
+        "VALUES\n",
+        "  (\n",
+        "    'It''s a title',\n",
+        "    7,\n",
+        "    ARRAY['a', 'b''c']\n",
+        "  );\n",
+    ]
+
+    rows = list(_iter_insert_rows(lines, list(ARTICLE_COLUMNS)))
+
+    assert rows == [{'title': "It's a title"}]
+
+
+def test_empty_output_has_no_rows(tmp_path):
+    path = tmp_path / 'articles_insert_1.sql'
+    path.write_text('')
+
+    assert list(iter_output_rows(str(path))) == []
+
+
+def names(topics):
+    return [topic['name'] for topic in topics]
+
+
+def test_titles_match_contained_topics():
+    index = PublishedIndex()
+    index.add_title('Mastering ROC AUC: Evaluating Classifiers')
+    index.add_title('Understanding Agent-environment interaction and Markov Decision Processes (MDPs)')
+    topics = [
+        {'name': 'ROC AUC'},
+        {'name': 'Agent–environment interaction and Markov Decision Processes (MDPs)'},
+        {'name': 'Precision and Recall'},
+        {'name': 'AUC'},
+    ]
+
+    assert names(index.new_topics(topics)) == ['Precision and Recall', 'AUC']
+    assert index.skipped == 2
+
+
+def test_title_is_claimed_by_the_most_specific_topic():
+    index = PublishedIndex()
+    index.add_title('Stochastic Gradient Descent Explained')
+    topics = [{'name': 'Gradient Descent'}, {'name': 'Stochastic Gradient Descent'}]
+
+    assert names(index.new_topics(topics)) == ['Gradient Descent']
+
+
+def test_topics_match_whole_words_only():
+    index = PublishedIndex()
+    index.add_title('Understanding Transformers in Practice')
+
+    assert names(index.new_topics([{'name': 'Transformer'}])) == ['Transformer']
+
+
+def test_output_file_reads_its_journal(tmp_path):
+    path = tmp_path / 'articles_insert_1.sql'
+    write_output(path, 'sql')
+    journal = RunJournal(str(tmp_path / 'articles_insert_1.journal.jsonl'))
+    journal.record_topic('Precision and Recall', 'completed', article={'title': 'Unrelated'})
+
+    index = PublishedIndex()
+    index.load(str(path))
+    topics = [{'name': 'precision-and-recall'}, {'name': 'ROC AUC'}, {'name': 'F1 Score'}]
+
+    assert names(index.new_topics(topics)) == ['F1 Score']
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming topic loader.
+JSON documents are read in chunks of several sizes, so values are cut at every
+position by a read boundary.
+"""
+
+import io
+
+import pytest
+
+import topic_loader
+from topic_loader import _JSONReader, iter_json_topics, iter_topics
+
+
+TOPICS = [
+    {'name': 'ROC AUC', 'weight': 0.75},
+    {'name': 'Gradient Descent', 'tags': ['ML', 'optimization'], 'rate': -1.5e-3},
+]
+
+DOCUMENT = (
+    '{"version": 2.125, "topics": [{"name": "ROC AUC", "weight": 0.75}, '
+    '{"name": "Gradient Descent", "tags": ["ML", "optimization"], "rate": -1.5e-3}], '
+    '"tail": 1.5e10}'
+)
+
+CHUNK_SIZES = [1, 3, 17, 51, 53]
+
+
+def read_topics(document: str) -> list:
+    return list(iter_json_topics(io.StringIO(document)))
+
+
+@pytest.mark.parametrize('read_chars', CHUNK_SIZES)
+def test_chunked_reads(monkeypatch, read_chars):
+    monkeypatch.setattr(topic_loader, 'READ_CHARS', read_chars)
+
+    assert read_topics(DOCUMENT) == TOPICS
+
+
+@pytest.mark.parametrize('read_chars', CHUNK_SIZES)
+@pytest.mark.parametrize('text, expected', [
+    ('1.5e10', 1.5e10),
+    ('-12.25', -12.25),
+    ('3E+2 ', 300.0),
+    ('123456789', 123456789),
+])
+def test_numbers_cut_at_read_boundaries(monkeypatch, read_chars, text, expected):
+    monkeypatch.setattr(topic_loader, 'READ_CHARS', read_chars)
+
+    assert _JSONReader(io.StringIO(text)).value() == expected
+
+
+@pytest.mark.parametrize('document', ['{"topics": []}', '{}', '[]', ' {"topics": [ ] , "tail": 1.5e10} \n'])
+def test_empty_documents(document):
+    assert read_topics(document) == []
+
+
+def test_bare_array():
+    assert read_topics('[{"name": "ROC AUC"}, {"name": "F1 Score"}]') == [{'name': 'ROC AUC'}, {'name': 'F1 Score'}]
+
+
+def test_non_object_entry():
+    topics = iter_json_topics(io.StringIO('{"topics": [{"name": "ROC AUC"}, "F1 Score"]}'))
+
+    assert next(topics) == {'name': 'ROC AUC'}
+    with pytest.raises(ValueError, match='Topic 2: expected a topic object, got str'):
+        next(topics)
+
+
+@pytest.mark.parametrize('document', ['{"topics": []} x', '[{"name": "ROC AUC"}]]', '{"topics": []}{}'])
+def test_trailing_data_is_rejected(document):
+    with pytest.raises(ValueError, match='after the end of the document'):
+        read_topics(document)
+
+
+def test_invalid_file_is_named(tmp_path):
+    path = tmp_path / 'topics.json'
+    path.write_text('{"topics": [{"name": "ROC AUC"}', encoding='utf-8')
+
+    with pytest.raises(ValueError, match="Invalid topics file '.*topics.json'"):
+        list(iter_topics(str(path)))
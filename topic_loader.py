@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Streaming topic loader for large topic catalogues.
+Reads topics one at a time from newline-delimited JSON files or incrementally from
+the {"topics": [...]} file format, so generation starts on the first topic and
+memory stays flat however large the catalogue is. Several files or directories
+can be read as one stream, skipping topics whose names repeat across them.
+"""
+
+import itertools
+import json
+import os
+import re
+import unicodedata
+from typing import IO, Any, Dict, Iterator, List, Tuple
+
+
+# Extensions of newline-delimited JSON topic files (one topic object per line)
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+
+# Extensions of the topics files read from an input directory
+TOPIC_EXTENSIONS = ('.json',) + NDJSON_EXTENSIONS
+
+# Prefix of the generator's own output files (reports, journals, failed
+# topics), which are skipped in input directories
+OUTPUT_PREFIX = 'articles_insert_'
+
+# Characters read from the file at a time
+READ_CHARS = 64 * 1024
+
+# Unicode punctuation categories folded into word breaks when comparing topic
+# names: dashes, brackets, quotes and connectors
+_FOLDED_CATEGORIES = ('Pd', 'Ps', 'Pe', 'Pi', 'Pf', 'Pc')
+
+# Other punctuation folded the same way; marks that change a name's meaning,
+# like the '#' of C# or the '.' of Node.js, are kept
+_FOLDED_CHARS = set(',:;!?"\'')
+
+_WHITESPACE = ' \t\r\n'
+
+# Characters of a number's fraction or exponent cut off at the end of a read
+_NUMBER_CHARS = set('0123456789.eE+-')
+
+
+class _JSONReader:
+    """Decode consecutive JSON values from a text stream, one read at a time."""
+
+    def __init__(self, f: IO[str]):
+        self.f = f
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(READ_CHARS)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has been consumed so the buffer stays small
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def next_char(self) -> str:
+        """Skip whitespace and consume the next character ('' at the end)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                self.pos += 1
+                return self.buffer[self.pos - 1]
+            if not self._fill():
+                return ''
+
+    def peek_char(self) -> str:
+        """Skip whitespace and return the next character without consuming it."""
+        char = self.next_char()
+        if char:
+            self.pos -= 1
+        return char
+
+    def value(self) -> Any:
+        """
+        Decode the next JSON value.
+
+        Raises:
+            ValueError: If the stream holds no valid value here
+        """
+        self.peek_char()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next
+            # read; raw_decode stops short of a cut like "1." or "1.5e-"
+            if (not isinstance(value, (str, list, dict)) and len(self.buffer) - end <= 2
+                    and set(self.buffer[end:]) <= _NUMBER_CHARS and self._fill()):
+                continue
+            self.pos = end
+            return value
+
+    def expect(self, expected: str) -> str:
+        """
+        Consume the next character, which must be one of expected.
+
+        Raises:
+            ValueError: If another character (or the end) comes next
+        """
+        char = self.next_char()
+        if not char or char not in expected:
+            found = repr(char) if char else 'end of file'
+            raise ValueError(f"Expected {' or '.join(repr(c) for c in expected)}, found {found}")
+        return char
+
+
+def iter_json_topics(f: IO[str]) -> Iterator[Dict]:
+    """
+    Stream the topics of a {"topics": [...]} document (or a bare array).
+
+    Args:
+        f: Text stream of the document
+
+    Yields:
+        Topic dictionaries in file order
+
+    Raises:
+        ValueError: If the document is not valid JSON of that shape, or
+            anything but whitespace follows it
+    """
+    reader = _JSONReader(f)
+    if reader.peek_char() == '[':
+        yield from _iter_topic_array(reader)
+    else:
+        yield from _iter_topic_object(reader)
+    char = reader.next_char()
+    if char:
+        raise ValueError(f"Unexpected {char!r} after the end of the document")
+
+
+def _iter_topic_object(reader: _JSONReader) -> Iterator[Dict]:
+    reader.expect('{')
+    if reader.peek_char() == '}':
+        reader.next_char()
+        return
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key == 'topics':
+            yield from _iter_topic_array(reader)
+        else:
+            reader.value()
+        if reader.expect(',}') == '}':
+            return
+
+
+def _iter_topic_array(reader: _JSONReader) -> Iterator[Dict]:
+    reader.expect('[')
+    if reader.peek_char() == ']':
+        reader.next_char()
+        return
+    for number in itertools.count(1):
+        topic = reader.value()
+        if not isinstance(topic, dict):
+            raise ValueError(f"Topic {number}: expected a topic object, got {type(topic).__name__}")
+        yield topic
+        if reader.expect(',]') == ']':
+            return
+
+
+def iter_ndjson_topics(f: IO[str]) -> Iterator[Dict]:
+    """
+    Stream the topics of a newline-delimited JSON file.
+
+    Blank lines are skipped.
+
+    Args:
+        f: Text stream with one topic object per line
+
+    Yields:
+        Topic dictionaries in file order
+
+    Raises:
+        ValueError: If a line is not a JSON object
+    """
+    for number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            topic = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {number}: {e}") from None
+        if not isinstance(topic, dict):
+            raise ValueError(f"Line {number}: expected a topic object, got {type(topic).__name__}")
+        yield topic
+
+
+def detect_format(filepath: str) -> str:
+    """
+    Tell newline-delimited topic files from JSON documents.
+
+    Files with an NDJSON_EXTENSIONS extension are newline-delimited; other
+    files are if their first line is a complete object with a 'name'. Only
+    the start of the first line is read, so minified documents stay cheap.
+
+    Args:
+        filepath: Topics file
+
+    Returns:
+        'ndjson' or 'json'
+    """
+    if os.path.splitext(filepath)[1].lower() in NDJSON_EXTENSIONS:
+        return 'ndjson'
+    with open(filepath, 'r', encoding='utf-8') as f:
+        line = f.readline(READ_CHARS)
+        while line and not line.strip():
+            line = f.readline(READ_CHARS)
+    try:
+        first = json.loads(line)
+    except ValueError:
+        return 'json'
+    return 'ndjson' if isinstance(first, dict) and 'name' in first else 'json'
+
+
+def iter_topics(filepath: str) -> Iterator[Dict]:
+    """
+    Stream the topics of a topics file in either format.
+
+    Args:
+        filepath: Topics file (.json document or newline-delimited JSON)
+
+    Yields:
+        Topic dictionaries in file order
+
+    Raises:
+        ValueError: If the file is malformed, naming the file
+    """
+    file_format = detect_format(filepath)
+    with open(filepath, 'r', encoding='utf-8') as f:
+        topics = iter_ndjson_topics(f) if file_format == 'ndjson' else iter_json_topics(f)
+        try:
+            yield from topics
+        except ValueError as e:
+            raise ValueError(f"Invalid topics file '{filepath}': {e}") from None
+
+
+def normalize_topic_name(name: str) -> str:
+    """
+    Reduce a topic name to the form compared when looking for duplicates.
+
+    Unicode compatibility forms, case, dash variants, brackets, quotes and
+    separators are ignored, so "Agent–environment interaction (MDPs)" and
+    "agent-environment interaction MDPs" normalize the same. Other
+    punctuation is kept, so "C#" and "C" stay different.
+
+    Args:
+        name: Topic name
+
+    Returns:
+        Normalized name
+    """
+    name = unicodedata.normalize('NFKC', name).casefold()
+    name = ''.join(
+        ' ' if char in _FOLDED_CHARS or unicodedata.category(char) in _FOLDED_CATEGORIES else char
+        for char in name
+    )
+    return re.sub(r'\s+', ' ', name).strip()
+
+
+def expand_inputs(paths: List[str]) -> List[str]:
+    """
+    Resolve input paths to topics files.
+
+    Directories are replaced by the TOPIC_EXTENSIONS files directly inside
+    them, in name order, leaving out the generator's own output files.
+
+    Args:
+        paths: Topics files and directories
+
+    Returns:
+        Topics files in reading order
+    """
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        for name in sorted(os.listdir(path)):
+            filepath = os.path.join(path, name)
+            if (
+                os.path.isfile(filepath)
+                and os.path.splitext(name)[1].lower() in TOPIC_EXTENSIONS
+                and not name.startswith(OUTPUT_PREFIX)
+            ):
+                files.append(filepath)
+    return files
+
+
+class TopicStream:
+    """
+    Re-iterable stream of the topics of one or more files.
+
+    Topics whose normalized name was already read, from the same or an
+    earlier file, are skipped, so each article is generated once; they are
+    listed in duplicates with the name of the topic kept instead.
+    """
+
+    def __init__(self, *filepaths: str):
+        """
+        Initialize the stream; the files are not read until iterated.
+
+        Args:
+            *filepaths: Topics files, read in order
+        """
+        self.filepaths = list(filepaths)
+        self.count = 0
+        # (skipped name, kept name) of each repeated topic
+        self.duplicates: List[Tuple[str, str]] = []
+
+    def __iter__(self) -> Iterator[Dict]:
+        self.count = 0
+        self.duplicates = []
+        seen: Dict[str, str] = {}
+        for filepath in self.filepaths:
+            for topic in iter_topics(filepath):
+                name = str(topic.get('name', ''))
+                key = normalize_topic_name(name)
+                if key in seen:
+                    self.duplicates.append((name, seen[key]))
+                    continue
+                seen[key] = name
+                self.count += 1
+                yield topic